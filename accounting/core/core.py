@@ -8,9 +8,11 @@ Core functionality of accounting package.
 import os
 import shutil
 import datetime
+import bisect
 from decimal import Decimal
 import itertools
 import logging
+from operator import attrgetter
 from lxml import etree
 from io import BytesIO
 import zipfile
@@ -23,6 +25,9 @@ from accounting.core.dateutils import date_from_value
 
 LOGGER = logging.getLogger(__name__)
 
+_ZERO = Decimal(0)
+_ITEM_CENTS = attrgetter("_cents")
+
 
 class DatabaseException(Exception):
     pass
@@ -35,12 +40,15 @@ class UnknownAccountException(DatabaseException):
 class Item(object):
     """An item is a subset of a transaction."""
 
+    __slots__ = ("_account", "_transaction", "_descr", "_value", "_cents", "_confirmed")
+
     def __init__(self, descr="", value=None, confirmed=False):
         """Construct item."""
         self._account = None
         self._transaction = None
         self._descr = ""
-        self._value = Decimal(0)
+        self._value = _ZERO
+        self._cents = 0
         self._confirmed = False
         self.setDescr(descr)
         self.setValue(value)
@@ -115,6 +123,7 @@ class Item(object):
         val = to_decimal(val)
         if val != self._value:
             self._value = val
+            self._cents = int(val.scaleb(2))
             return True
         else:
             return False
@@ -157,7 +166,7 @@ class Item(object):
         if self._account:
             return self._account.fullname
         else:
-            return u""
+            return ""
 
     @property
     def transaction(self):
@@ -196,6 +205,8 @@ class Item(object):
 class Transaction(object):
     """A transaction combines multiple items at a given date."""
 
+    __slots__ = ("_db", "_date", "_descr", "_items")
+
     def __init__(self, date=None, descr=""):
         """Construct transaction."""
         date = date_from_value(date) if date else None
@@ -210,7 +221,7 @@ class Transaction(object):
         return "Transaction(date={!r},descr={!r})".format(self._date, self._descr)
 
     def __str__(self):
-        return u"{} {}".format(self._date, self._descr)
+        return "{} {}".format(self._date, self._descr)
 
     def __len__(self):
         return len(self._items)
@@ -237,6 +248,30 @@ class Transaction(object):
             raise TypeError()
         return self
 
+    def addItems(self, entries):
+        """Add given items to transaction at once.
+        Each entry is either an item or a tuple of (descr, value, account).
+        Return list of added items."""
+        known = set(self._items)
+        added = []
+        for entry in entries:
+            if isinstance(entry, Item):
+                item, account = entry, None
+            else:
+                descr, value, account = entry
+                item = Item(descr, value)
+            if item not in known:
+                known.add(item)
+                self._items.append(item)
+                # attach directly, item += self would scan our items again
+                if item._transaction is not None:
+                    item._transaction -= item
+                item._transaction = self
+                added.append(item)
+            if account is not None:
+                item += account
+        return added
+
     def __isub__(self, other):
         """Remove given instance from item."""
         if isinstance(other, Item):
@@ -270,7 +305,7 @@ class Transaction(object):
 
         self._date = date
         if self._db:
-            self._db.sortTransactions()
+            self._db._sorted = False
         return True
 
     @property
@@ -299,11 +334,15 @@ class Transaction(object):
 
     def getBalance(self):
         """Return sum of all items of this transaction."""
-        return sum([i.value for i in self._items])
+        return Decimal(self._balanceCents()).scaleb(-2)
+
+    def _balanceCents(self):
+        """Return sum of all items of this transaction in cents."""
+        return sum(map(_ITEM_CENTS, self._items))
 
     def isBalanced(self):
         """Returns true when items are balanced ( values distributed equally among accounts )."""
-        return self.getBalance() == 0
+        return self._balanceCents() == 0
 
     @staticmethod
     def parseFromXml(elem, db):
@@ -388,7 +427,7 @@ class AccountTreeItem(QObject):
 class Account(AccountTreeItem):
     """An account is the target/source of an item."""
 
-    SEPARATOR = u"/"
+    SEPARATOR = "/"
 
     TYPE_UNKNOWN = 0
     TYPE_PROFIT = 1  # getting money from
@@ -422,6 +461,7 @@ class Account(AccountTreeItem):
         self._name = str(name)
         self._type = type_
         self._db = None
+        self._selfAndChildAccounts = None
 
     def __repr__(self, ):
         return "Account(name={!r})".format(self.fullname)
@@ -454,6 +494,7 @@ class Account(AccountTreeItem):
                         return
                     else:
                         self._childAccounts[idx] = value
+                        self._childAccountsChanged()
                         return
         raise KeyError
 
@@ -477,6 +518,7 @@ class Account(AccountTreeItem):
             if not other in self._childAccounts:
                 self._childAccounts += [other]
                 other._parentAccount = self
+                self._childAccountsChanged()
         elif isinstance(other, Database):
             if other != self._db:
                 self._db = other
@@ -493,6 +535,7 @@ class Account(AccountTreeItem):
             if other in self._childAccounts:
                 self._childAccounts.remove(other)
                 other._parentAccount = None
+                self._childAccountsChanged()
         elif isinstance(other, Database):
             if self._db == other:
                 db = self._db
@@ -502,6 +545,30 @@ class Account(AccountTreeItem):
             raise TypeError()
         return self
 
+    def _accountPathsChanged(self):
+        """Let database know that full names of its accounts may have changed."""
+        db = self.db
+        if db is not None:
+            db._accountsByPath = None
+
+    def _childAccountsChanged(self):
+        """Drop cached (grand) child accounts of this account and its parents."""
+        acc = self
+        while acc is not None:
+            acc._selfAndChildAccounts = None
+            acc = acc._parentAccount
+        self._accountPathsChanged()
+
+    def selfAndChildAccounts(self):
+        """Return set of this account and its (grand) child accounts."""
+        if self._selfAndChildAccounts is None:
+            self._selfAndChildAccounts = frozenset([self] + self.getChildAccounts(True))
+        return self._selfAndChildAccounts
+
+    def isSelfOrHasChildAccount(self, child):
+        """Return true when given account is self or a child of self."""
+        return child in self.selfAndChildAccounts()
+
     def filterItems(self, filter_=None):
         """Get iterator for items of current account matching given AND combined filters"""
         accFilter = FilterAccountsAndChildren(self)
@@ -534,6 +601,7 @@ class Account(AccountTreeItem):
         n = str(newName)
         if self._name != n:
             self._name = n
+            self._accountPathsChanged()
             self.nameChanged.emit(self._name)
         return True
 
@@ -609,7 +677,9 @@ class Database(AccountTreeItem):
         """Construct database."""
         super().__init__()
         self._transactions = []
-        self._parsing = False
+        self._sorted = True
+        self._dates = None
+        self._accountsByPath = None
 
     def nofTransactions(self):
         """Return number of transactions in database"""
@@ -619,16 +689,21 @@ class Database(AccountTreeItem):
         """Return number of accounts in database"""
         return len(self.getChildAccounts(True))
 
+    def _accountPaths(self):
+        """Return dict of accounts by their full name, rebuilt when accounts changed."""
+        if self._accountsByPath is None:
+            accountsByPath = {}
+            for acc in self.getChildAccounts(True):
+                accountsByPath.setdefault(acc.fullname, acc)
+            self._accountsByPath = accountsByPath
+        return self._accountsByPath
+
     def __getitem__(self, key):
         """Get account by given name."""
         if isinstance(key, str):
-            parts = key.split(Account.SEPARATOR)
-            for acc in self._childAccounts:
-                if parts[0] == acc.name:
-                    if len(parts) > 1:
-                        return acc[Account.SEPARATOR.join(parts[1:])]
-                    else:
-                        return acc
+            acc = self._accountPaths().get(key)
+            if acc is not None:
+                return acc
         raise KeyError
 
     def __setitem__(self, key, value):
@@ -644,46 +719,60 @@ class Database(AccountTreeItem):
                         return
                     else:
                         self._childAccounts[idx] = value
+                        self._accountsByPath = None
                         return
         raise KeyError
 
     def __contains__(self, key):
         """Return true when named account exists in database."""
-        if isinstance(key, str):
-            parts = key.split(Account.SEPARATOR)
-            for acc in self._childAccounts:
-                if parts[0] == acc.name:
-                    if len(parts) > 1:
-                        return Account.SEPARATOR.join(parts[1:]) in acc
-                    else:
-                        return True
-        return False
+        return isinstance(key, str) and key in self._accountPaths()
 
     def __iadd__(self, other):
         """Add instance to database."""
         if isinstance(other, Account):
             if not other in self._childAccounts:
                 self._childAccounts += [other]
+                self._accountsByPath = None
                 other += self
         elif isinstance(other, Transaction):
             if not other in self._transactions:
-                self._transactions += [other]
+                self._transactions.append(other)
+                self._sorted = False
                 other += self
-                if not self._parsing:
-                    self.sortTransactions()
+        elif isinstance(other, (list, tuple)):
+            self.addTransactions(other)
         else:
             raise TypeError()
         return self
 
+    def addTransactions(self, transactions):
+        """Add given transactions to database at once."""
+        transactions = list(transactions)
+        if not all(isinstance(trn, Transaction) for trn in transactions):
+            raise TypeError("Expected Transaction instances")
+        known = set(self._transactions)
+        for trn in transactions:
+            if trn not in known:
+                known.add(trn)
+                if trn.db is not None:
+                    db = trn.db
+                    db -= trn
+                trn._db = self
+                self._transactions.append(trn)
+                self._sorted = False
+        return self
+
     def __isub__(self, other):
         """Remove instance from database."""
         if isinstance(other, Account):
             if other in self._childAccounts:
                 self._childAccounts.remove(other)
+                self._accountsByPath = None
                 other -= self
         elif isinstance(other, Transaction):
             if other in self._transactions:
                 self._transactions.remove(other)
+                self._dates = None
                 other -= self
         else:
             raise TypeError()
@@ -692,13 +781,32 @@ class Database(AccountTreeItem):
     def sortTransactions(self):
         """Trigger sorting of transactions"""
         self._transactions.sort(key=lambda t: t.date)
+        self._sorted = True
+        self._dates = None
+
+    def _sortedTransactions(self):
+        """Return list of transactions sorted by date, sorting only when modified since last call."""
+        if not self._sorted:
+            self.sortTransactions()
+        return self._transactions
+
+    def _transactionsBetween(self, fromDate, tillDate):
+        """Return list of transactions dated between ( including ) from and till date,
+        locating them in date sorted transactions by bisection."""
+        transactions = self._sortedTransactions()
+        if self._dates is None:
+            self._dates = [t.date for t in transactions]
+        lo = bisect.bisect_left(self._dates, fromDate)
+        hi = bisect.bisect_right(self._dates, tillDate, lo)
+        return transactions[lo:hi]
 
     def filterTransactions(self, filter_=None):
         """Get iterator for transactions matching given filter"""
+        transactions = self._sortedTransactions()
         if filter_ is None:
-            return iter(self._transactions)
+            return iter(transactions)
         else:
-            return itertools.filterfalse(filter_.rejected, self._transactions)
+            return itertools.filterfalse(filter_.rejected, transactions)
 
     def filterItems(self, filter_=None):
         """Get iterator for items matching given filter"""
@@ -706,6 +814,27 @@ class Database(AccountTreeItem):
         trnItemsIter = map(lambda trn: trn.filterItems(filter_), trnIter)
         return itertools.chain.from_iterable(trnItemsIter)
 
+    def filterItemsBetween(self, fromDate, tillDate, filter_=None):
+        """Get iterator for items dated between ( including ) from and till date matching given filter"""
+        trnIter = iter(self._transactionsBetween(date_from_value(fromDate), date_from_value(tillDate)))
+        if filter_ is not None:
+            trnIter = itertools.filterfalse(filter_.rejected, trnIter)
+        trnItemsIter = map(lambda trn: trn.filterItems(filter_), trnIter)
+        return itertools.chain.from_iterable(trnItemsIter)
+
+    def distinctDescriptionsBetween(self, fromDate, tillDate, kind=Transaction):
+        """Return set of descriptions of transactions ( or items if kind is Item )
+        dated between ( including ) from and till date."""
+        if kind not in (Transaction, Item):
+            raise TypeError("Expected Transaction or Item")
+        descrs = set()
+        for trn in self._transactionsBetween(fromDate, tillDate):
+            if kind is Transaction:
+                descrs.add(trn.descr)
+            else:
+                descrs.update(item.descr for item in trn)
+        return descrs
+
     @staticmethod
     def parseFromXml(elem):
         if not elem.tag == "database":
@@ -713,8 +842,6 @@ class Database(AccountTreeItem):
         LOGGER.debug("Parsing database...")
         db = Database()
         try:
-            db._parsing = True
-
             saved = elem.xpath("meta/saved/@datetime")
             saved = datetime.datetime.strptime(saved[0], "%Y-%m-%d %H:%M:%S") if saved else None
             LOGGER.debug("Saved on {}".format(saved or "?"))
@@ -741,15 +868,8 @@ class Database(AccountTreeItem):
         except:
             LOGGER.exception("Failed to parse database")
             raise
-        finally:
-            db._parsing = False
         return db
 
-    @property
-    def parsing(self):
-        """Return true when database is in process of parsing from xml."""
-        return self._parsing
-
     def toXml(self):
         root = etree.Element("database")
         metaElem = etree.SubElement(root, "meta")
@@ -764,7 +884,7 @@ class Database(AccountTreeItem):
             acc.toXml(accElem)
 
         trnElem = etree.SubElement(root, "transactions")
-        for t in self._transactions:
+        for t in self._sortedTransactions():
             t.toXml(trnElem)
 
         return root
@@ -935,7 +1055,7 @@ class FilterAccountsAndChildren(Filter):
     def _accepted(self, obj):
         if isinstance(obj, Item):
             for acc in self._accounts:
-                if acc.isSelfOrHasChildAccount(obj.account):
+                if obj.account in acc.selfAndChildAccounts():
                     return True
             return False
         elif isinstance(obj, Transaction):
@@ -956,7 +1076,7 @@ class FilterNotAccountsAndChildren(Filter):
     def _accepted(self, obj):
         if isinstance(obj, Item):
             for acc in self._accounts:
-                if acc.isSelfOrHasChildAccount(obj.account):
+                if obj.account in acc.selfAndChildAccounts():
                     return False
             return True
         elif isinstance(obj, Transaction):
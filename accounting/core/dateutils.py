@@ -5,6 +5,7 @@ Helper functions related to date/time
 @author: Manuel Koch
 '''
 import datetime
+import functools
 from calendar import Calendar
 
 
@@ -79,6 +80,7 @@ INTERVAL_ANUALY = 4
 ALL_INTERVALS = [INTERVAL_DAILY, INTERVAL_WEEKLY, INTERVAL_MONTHLY, INTERVAL_ANUALY]
 
 
+@functools.lru_cache(maxsize=4096)
 def rangeDateFromTillByInterval(fromDate, tillDate, interval):
     """Adjust given from/till date by selected interval.
     Returns tuple of adjusted from/till date."""
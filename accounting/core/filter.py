@@ -55,15 +55,34 @@ class Filter(abc.ABC):
         else:
             return not self._accepted(obj)
 
+    def acceptedMany(self, objs):
+        """Return list of given objects that are accepted by this filter instance, keeping their order"""
+        if self._op == Filter.Operator.AND and self._combined:
+            # let every combined filter sweep the remaining objects at once
+            for f in self._combined:
+                objs = f.acceptedMany(objs)
+            return objs
+        accepted = self.accepted
+        return [obj for obj in objs if accepted(obj)]
+
     @abc.abstractmethod
     def _accepted(self, obj):
         """Derived classes implement this method to return true when given object is filtered / accepted"""
 
+    def _andCombined(self):
+        """Return tuple of filters that need to accept an object for this filter instance to accept it"""
+        if self._op == Filter.Operator.AND and self._combined:
+            return self._combined
+        if self._op is None and not self._combined and isinstance(self, CombinedFilter):
+            return ()  # accepts everything
+        return (self,)
+
     def __and__(self, other):
         """Returns AND combined filter of this and other filter"""
         if not isinstance(other, Filter):
             raise TypeError("Expected Filter")
-        return CombinedFilter(Filter.Operator.AND, self, other)
+        # nested AND combinations are flattened into one sequence of filters
+        return CombinedFilter(Filter.Operator.AND, *(self._andCombined() + other._andCombined()))
 
     def __or__(self, other):
         """Returns OR combined filter of this and other filter"""
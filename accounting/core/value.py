@@ -54,7 +54,7 @@ def eval_decimal(txt, prec=2):
                                                                                                                     mulMatch.end():]
             continue
         elif (divMatch and not mulMatch) or (divMatch and mulMatch and divMatch.start() < mulMatch.start()):
-            txt = txt[:divMatch.start()] + evalpair(divMatch.group("arg1"), divMatch.group("arg2"), operator.div) + txt[
+            txt = txt[:divMatch.start()] + evalpair(divMatch.group("arg1"), divMatch.group("arg2"), operator.truediv) + txt[
                                                                                                                     divMatch.end():]
             continue
         addMatch = ADD_RE.search(txt)
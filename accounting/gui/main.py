@@ -20,7 +20,7 @@ from PyQt5 import QtGui, QtWidgets, QtCore, QtNetwork  # , QtWebKitWidgets
 from PyQt5.QtWidgets import QDialog
 
 import accounting.gui.resources
-from accounting.core.core import Database, Account, Transaction, Item
+from accounting.core.core import Database, Account, Transaction
 from accounting.gui.models import AccountModel
 from accounting.gui.widget.acctree import AccountTree
 from accounting.gui.widget.trnview import AccountTransactionView
@@ -307,7 +307,6 @@ class MainWindow(QtWidgets.QMainWindow):
         self._db = Database()
         self._dbPath = "unnamed"
 
-        self._db._parsing = True
         for i in range(32):
             acc = Account("Account%d" % i)
             self._db += acc
@@ -319,18 +318,15 @@ class MainWindow(QtWidgets.QMainWindow):
                     cacc += ccacc
         accs = self._db.getChildAccounts(True)
         dt = datetime.datetime.now() - datetime.timedelta(seconds=60 * 60 * 500)
+        trns = []
         for i in range(3000):
             t = Transaction(dt, "#" * random.randint(1, 32))
-            self._db += t
             v = float(random.randint(1, 1000)) / 100
-            i = Item("A" * random.randint(1, 32), v)
-            t += i
-            i += random.choice(accs)
-            i = Item("B" * random.randint(1, 32), -v)
-            t += i
-            i += random.choice(accs)
+            t.addItems([("A" * random.randint(1, 32), v, random.choice(accs)),
+                        ("B" * random.randint(1, 32), -v, random.choice(accs))])
+            trns += [t]
             dt += datetime.timedelta(seconds=60 * 60)
-        self._db._parsing = False
+        self._db.addTransactions(trns)
 
         self._accountTree.setDatabase(self._db)
         self._accountTree.expandAll()
@@ -5,6 +5,7 @@ Models of data structures
 @author: Manuel Koch
 '''
 from collections import namedtuple
+import bisect
 import datetime
 from decimal import Decimal
 import logging
@@ -185,6 +186,11 @@ class AccountTransactionsModel(QtCore.QAbstractTableModel):
     RowTypeItem = 1
     AllRowTypes = (RowTypeTransaction, RowTypeItem)
 
+    # roles answered by data(), views query many more per cell
+    DATA_ROLES = frozenset((QtCore.Qt.DisplayRole, QtCore.Qt.EditRole, QtCore.Qt.CheckStateRole,
+                            QtCore.Qt.BackgroundRole, QtCore.Qt.FontRole, QtCore.Qt.TextAlignmentRole,
+                            QtCore.Qt.ToolTipRole, RowTypeRole))
+
     def __init__(self, account, parent=None):
         "Construct model for transactions related to given account."
         super().__init__(parent)
@@ -196,6 +202,8 @@ class AccountTransactionsModel(QtCore.QAbstractTableModel):
         self._rowCache = []
         self._rowCacheSize = len(self._rowCache)
         self._rowCacheDateRange = (None, None)
+        self._trnRows = []
+        self._trnRowDates = []
         self._updateRowCache()
 
     def refresh(self):
@@ -230,6 +238,9 @@ class AccountTransactionsModel(QtCore.QAbstractTableModel):
             self._rowCache += [AccountTransactionsModel.CachedRow(trn, None, accu)]
             self._rowCache += trnItemRows
         self._rowCacheSize = len(self._rowCache)
+        # dates of transaction rows, ascending, to find rows by date quickly
+        self._trnRows = [row for row, cachedRow in enumerate(self._rowCache) if cachedRow.trn is not None]
+        self._trnRowDates = [self._rowCache[row].trn.date for row in self._trnRows]
         newDateRange = self._getRowCacheDateRange()
         if self._rowCacheDateRange != newDateRange:
             self._rowCacheDateRange = newDateRange
@@ -284,6 +295,17 @@ class AccountTransactionsModel(QtCore.QAbstractTableModel):
     def getDateRange(self):
         return self._getRowCacheDateRange()
 
+    def rowType(self, row):
+        "Return type of given row, i.e. RowTypeTransaction or RowTypeItem, None for invalid row"
+        if row < 0 or row >= self._rowCacheSize:
+            return None
+        cachedRow = self._rowCache[row]
+        if cachedRow.trn is not None:
+            return AccountTransactionsModel.RowTypeTransaction
+        elif cachedRow.item is not None:
+            return AccountTransactionsModel.RowTypeItem
+        return None
+
     def filterAcceptsRow(self, row, filter_):
         "Return true when given row is accepted by filter"
         if filter_ is None:
@@ -346,28 +368,7 @@ class AccountTransactionsModel(QtCore.QAbstractTableModel):
         "Add new item to transaction corresponding to given index"
         if not idx.isValid():
             return
-        row = self._rowCache[idx.row()]
-        transaction, item, dummyAccu = row
-        newItem = None
-        if transaction is not None:
-            newItem = Item(descr, value)
-            if confirmed is not None:
-                newItem.setConfirmed(confirmed)
-            transaction += newItem
-            newItem += self._account
-            if value is None and not transaction.isBalanced():
-                # try to balance transaction when new item has been added
-                newItem.setValue(-transaction.getBalance())
-        elif item is not None:
-            trn = item.transaction
-            newItem = Item(descr, value)
-            if confirmed is not None:
-                newItem.setConfirmed(confirmed)
-            trn += newItem
-            newItem += self._account
-            if value is None and not trn.isBalanced():
-                # try to balance transaction when new item has been added
-                newItem.setValue(-trn.getBalance())
+        newItem = self._createTransactionItem(idx.row(), descr, value, confirmed)
         if newItem:
             self._updateRowCache()
             firstRow = self._getRowCacheIdx(newItem)
@@ -375,6 +376,52 @@ class AccountTransactionsModel(QtCore.QAbstractTableModel):
             self.endInsertRows()
             self.setDirty(True)
 
+    def addTransactionItems(self, idx, items):
+        """Add new items to transaction corresponding to given index.
+        Each item is given as dict of keyword arguments of addTransactionItem().
+        Multiple items are announced as one layout change instead of one insertion per item."""
+        if not idx.isValid() or not items:
+            return
+        if len(items) == 1:
+            self.addTransactionItem(idx, **items[0])
+            return
+        hint = QtCore.QAbstractItemModel.VerticalSortHint
+        self.layoutAboutToBeChanged.emit([], hint)
+        oldIndices = self.persistentIndexList()
+        oldInstances = [self._getRowCacheInstance(oldIdx.row()) for oldIdx in oldIndices]
+        newItems = [self._createTransactionItem(idx.row(), **kwargs) for kwargs in items]
+        self._updateRowCache()
+        newRows = {id(self._getRowCacheInstance(row)): row for row in range(self._rowCacheSize)}
+        newIndices = [self.index(newRows[id(instance)], oldIdx.column())
+                      if id(instance) in newRows else QtCore.QModelIndex()
+                      for oldIdx, instance in zip(oldIndices, oldInstances)]
+        self.changePersistentIndexList(oldIndices, newIndices)
+        self.layoutChanged.emit([], hint)
+        if any(newItems):
+            self.setDirty(True)
+
+    def _getRowCacheInstance(self, row):
+        "Get transaction or item of given row in row cache."
+        cachedRow = self._rowCache[row]
+        return cachedRow.trn if cachedRow.trn is not None else cachedRow.item
+
+    def _createTransactionItem(self, row, descr="", value=None, confirmed=None):
+        "Create new item in transaction of given row in row cache, without updating the row cache."
+        transaction, item, dummyAccu = self._rowCache[row]
+        if transaction is None and item is not None:
+            transaction = item.transaction
+        if transaction is None:
+            return None
+        newItem = Item(descr, value)
+        if confirmed is not None:
+            newItem.setConfirmed(confirmed)
+        transaction += newItem
+        newItem += self._account
+        if value is None and not transaction.isBalanced():
+            # try to balance transaction when new item has been added
+            newItem.setValue(-transaction.getBalance())
+        return newItem
+
     def changeTransactionItem(self, idx, date, descr="", value=None, confirmed=None):
         "Change item at given idx with selected values"
         if not idx.isValid():
@@ -421,15 +468,14 @@ class AccountTransactionsModel(QtCore.QAbstractTableModel):
                         nearCol = ecol
                 if nearIdx != -1:
                     return self.index(nearIdx, nearCol)
-        if date is not None:
-            nearDate = (datetime.timedelta.max, -1)
-            for idx, (trn, item, dummyAccu) in enumerate(self._rowCache):
-                if trn is not None:
-                    dt = abs(trn.date - date)
-                    if dt < nearDate[0]:
-                        nearDate = (dt, idx)
-            if nearDate[1] != -1:
-                return self.index(nearDate[1], AccountTransactionsModel.COL_DATE)
+        if date is not None and self._trnRowDates:
+            # nearest transaction is either the first one at/after given date or the one before it
+            i = bisect.bisect_left(self._trnRowDates, date)
+            if i == len(self._trnRowDates) or \
+                    (i > 0 and date - self._trnRowDates[i - 1] <= self._trnRowDates[i] - date):
+                # use first of the transactions sharing that date
+                i = bisect.bisect_left(self._trnRowDates, self._trnRowDates[i - 1])
+            return self.index(self._trnRows[i], AccountTransactionsModel.COL_DATE)
         return QtCore.QModelIndex()
 
     def insertRow(self, row, parentIdx=QtCore.QModelIndex()):
@@ -488,6 +534,8 @@ class AccountTransactionsModel(QtCore.QAbstractTableModel):
         return 7
 
     def data(self, index, role=QtCore.Qt.DisplayRole):
+        if role not in AccountTransactionsModel.DATA_ROLES:
+            return None
         if not index.isValid() or index.row() >= self._rowCacheSize:
             return None
         colIdx = index.column()
@@ -574,10 +622,7 @@ class AccountTransactionsModel(QtCore.QAbstractTableModel):
             elif b:
                 return b
         elif role == AccountTransactionsModel.RowTypeRole:
-            if cachedRow.trn is not None:
-                return AccountTransactionsModel.RowTypeTransaction
-            elif cachedRow.item is not None:
-                return AccountTransactionsModel.RowTypeItem
+            return self.rowType(index.row())
         return None
 
     def setData(self, idx, value, role=QtCore.Qt.EditRole):
@@ -589,6 +634,8 @@ class AccountTransactionsModel(QtCore.QAbstractTableModel):
         accuChanged = False
         trnMoved = None
         itemMoved = None
+        if colIdx == AccountTransactionsModel.COL_DATE and isinstance(value, QtCore.QDate):
+            value = value.toPyDate()
         if role == QtCore.Qt.EditRole:
             if cachedRow.trn is not None:
                 oldTrnRows = self._getRowCacheTrnSpan(cachedRow.trn)
@@ -750,6 +797,7 @@ class CustomTransactionFilter(QtCore.QSortFilterProxyModel):
     def __init__(self, parent=None):
         super().__init__(parent)
         self._filter = None
+        self._accepted = None  # acceptance of each source row by current filter, built on demand
 
     def getAccount(self):
         return self.sourceModel().getAccount()
@@ -767,9 +815,22 @@ class CustomTransactionFilter(QtCore.QSortFilterProxyModel):
         srcIdx = self.sourceModel().findRow(filter_, date)
         return self.mapFromSource(srcIdx)
 
+    def rowType(self, row):
+        "Return type of given row, read from source model"
+        srcIdx = self.mapToSource(self.index(row, 0))
+        return self.sourceModel().rowType(srcIdx.row())
+
     def setSourceModel(self, model):
         if not isinstance(model, AccountTransactionsModel):
             raise TypeError("Expected AccountTransactionsModel")
+        # connect before the proxy does, acceptance of rows must be current when proxy filters them
+        for signal in (model.modelAboutToBeReset, model.modelReset,
+                       model.layoutAboutToBeChanged, model.layoutChanged,
+                       model.rowsAboutToBeMoved, model.rowsMoved):
+            signal.connect(self._invalidateAccepted)
+        model.rowsInserted.connect(self._insertAccepted)
+        model.rowsRemoved.connect(self._removeAccepted)
+        model.dataChanged.connect(self._updateAccepted)
         super().setSourceModel(model)
         model.dirty.connect(self.dirty)
         model.dateRangeChanged.connect(self.dateRangeChanged)
@@ -779,30 +840,73 @@ class CustomTransactionFilter(QtCore.QSortFilterProxyModel):
         changed = self._filter != filter_
         self._filter = filter_
         if changed:
+            self._accepted = None
             self.invalidateFilter()
 
     def filterAcceptsRow(self, srcRow, srcParentIdx):
+        if self._filter is None:
+            return True
+        if self._accepted is None:
+            src = self.sourceModel()
+            self._accepted = [src.filterAcceptsRow(row, self._filter) for row in range(src.rowCount(QtCore.QModelIndex()))]
+        if srcRow < len(self._accepted):
+            return self._accepted[srcRow]
         return self.sourceModel().filterAcceptsRow(srcRow, self._filter)
 
+    def _invalidateAccepted(self, *args):
+        "Forget acceptance of rows, rows of source model have changed"
+        self._accepted = None
+
+    def _insertAccepted(self, parentIdx, first, last):
+        "Evaluate acceptance of inserted rows only"
+        if self._accepted is None:
+            return
+        src = self.sourceModel()
+        if len(self._accepted) + last - first + 1 != src.rowCount(QtCore.QModelIndex()):
+            self._accepted = None  # acceptance got built from rows that already include inserted ones
+            return
+        self._accepted[first:first] = [src.filterAcceptsRow(row, self._filter) for row in range(first, last + 1)]
+
+    def _removeAccepted(self, parentIdx, first, last):
+        "Forget acceptance of removed rows only"
+        if self._accepted is None:
+            return
+        if len(self._accepted) - (last - first + 1) != self.sourceModel().rowCount(QtCore.QModelIndex()):
+            self._accepted = None  # acceptance got built from rows that already lack removed ones
+            return
+        del self._accepted[first:last + 1]
+
+    def _updateAccepted(self, topLeft, bottomRight, roles=None):
+        "Update acceptance of changed rows"
+        if self._accepted is None:
+            return
+        src = self.sourceModel()
+        for row in range(topLeft.row(), min(bottomRight.row() + 1, len(self._accepted))):
+            self._accepted[row] = src.filterAcceptsRow(row, self._filter)
+
     def insertRow(self, row, parentIdx=QtCore.QModelIndex()):
-        myidx = self.index(row, 0)
-        srcidx = self.mapToSource(myidx)
-        row = srcidx.row()
-        return self.sourceModel().insertRow(row, self.mapToSource(parentIdx))
+        if row < 0:
+            # nothing to map, source model adds the first transaction
+            return self.insertRowSource(row)
+        srcidx = self.mapToSource(self.index(row, 0))
+        return self.sourceModel().insertRow(srcidx.row(), self.mapToSource(parentIdx))
 
     def removeRow(self, row, parentIdx=QtCore.QModelIndex()):
-        idx = self.index(row, 0)
-        idx = self.mapToSource(idx)
-        row = idx.row()
-        return self.sourceModel().removeRow(row, self.mapToSource(parentIdx))
+        if row < 0:
+            return False
+        srcidx = self.mapToSource(self.index(row, 0))
+        return self.sourceModel().removeRow(srcidx.row(), self.mapToSource(parentIdx))
 
-    def data(self, idx, role=QtCore.Qt.DisplayRole):
-        idx = self.mapToSource(idx)
-        return self.sourceModel().data(idx, role)
+    def insertRowSource(self, srcRow, srcParentIdx=QtCore.QModelIndex()):
+        "Insert row at given row of source model, without mapping from/to source"
+        return self.sourceModel().insertRow(srcRow, srcParentIdx)
 
-    def setData(self, idx, value, role=QtCore.Qt.EditRole):
-        idx = self.mapToSource(idx)
-        return self.sourceModel().setData(idx, value, role)
+    def removeRowSource(self, srcRow, srcParentIdx=QtCore.QModelIndex()):
+        "Remove given row of source model, without mapping from/to source"
+        return self.sourceModel().removeRow(srcRow, srcParentIdx)
+
+    # data() and setData() are inherited, QSortFilterProxyModel maps
+    # to the source model without a roundtrip through Python
 
     def balanceTransaction(self, idx):
         idx = self.mapToSource(idx)
@@ -815,6 +919,10 @@ class CustomTransactionFilter(QtCore.QSortFilterProxyModel):
         idx = self.mapToSource(idx)
         return self.sourceModel().addTransactionItem(idx, **kwargs)
 
+    def addTransactionItems(self, idx, items):
+        idx = self.mapToSource(idx)
+        return self.sourceModel().addTransactionItems(idx, items)
+
     def changeTransactionItem(self, idx, **kwargs):
         idx = self.mapToSource(idx)
         return self.sourceModel().changeTransactionItem(idx, **kwargs)
@@ -898,14 +1006,38 @@ class ImporterEntriesModel(QtCore.QAbstractItemModel):
 
     def removeRow(self, row, parentIdx=QtCore.QModelIndex()):
         "Return true when row has been removed."
-        if row < 0 or row >= len(self._entries):
+        return self.removeRows(row, 1, parentIdx)
+
+    def removeRows(self, row, count, parentIdx=QtCore.QModelIndex()):
+        "Return true when given number of contiguous rows, starting at row, have been removed."
+        if row < 0 or count < 1 or row + count > len(self._entries):
             return False
-        self.beginRemoveRows(parentIdx, row, row)
-        del self._entries[row]
+        self.beginRemoveRows(parentIdx, row, row + count - 1)
+        del self._entries[row:row + count]
         self.endRemoveRows()
         return True
 
 
+class SeparatedStringListModel(QtCore.QStringListModel):
+    "String list model that renders selected rows as separator in combo box popups"
+
+    def __init__(self, strings, separatorRows=(), parent=None):
+        super().__init__(strings, parent)
+        self._separatorRows = frozenset(separatorRows)
+
+    def data(self, idx, role=QtCore.Qt.DisplayRole):
+        if idx.row() in self._separatorRows:
+            if role == QtCore.Qt.AccessibleDescriptionRole:
+                return "separator"  # marker used by QComboBox's delegate to draw a separator
+            return None
+        return super().data(idx, role)
+
+    def flags(self, idx):
+        if idx.row() in self._separatorRows:
+            return QtCore.Qt.NoItemFlags
+        return super().flags(idx)
+
+
 class AnyStringFilteredModel(QtCore.QSortFilterProxyModel):
     "Filter rows case-insensitive that share given string"
 
@@ -914,6 +1046,8 @@ class AnyStringFilteredModel(QtCore.QSortFilterProxyModel):
         self.txt = ""
 
     def filterAcceptsRow(self, sourceRow, sourceParent):
+        if not self.txt:
+            return True
         index0 = self.sourceModel().index(sourceRow, 0, sourceParent)
         txt = self.sourceModel().data(index0, QtCore.Qt.DisplayRole).lower()
         return self.txt in txt
@@ -43,19 +43,47 @@ class AccountTree(QtWidgets.QTreeView):
         self.doubleClicked.connect( self._onDblClicked )
         self._model       = None
         self._sortedmodel = None
+        self._pendingDb   = None
+        self._pendingExpandAll = False
         
     def setDatabase(self,db):
-        "Set database for tree view."
-        if db:
-            self._model = AccountModel( db )
-            self._model.dirty.connect( self.dirty )
-            self._model.rowsInserted.connect( self._onRowsInserted )
-            self._sortedmodel = QtCore.QSortFilterProxyModel()
-            self._sortedmodel.setDynamicSortFilter( True )
-            self._sortedmodel.setSourceModel( self._model )
-            self.setModel( self._sortedmodel )
-        else:
+        "Set database for tree view, models get build when tree view is shown."
+        self._model       = None
+        self._sortedmodel = None
+        self._pendingDb   = db
+        self._pendingExpandAll = False
+        if not db:
             self.setModel( None )
+        elif self.isVisible():
+            self._buildModels()
+
+    def _buildModels(self):
+        "Build models for pending database."
+        db = self._pendingDb
+        self._pendingDb = None
+        self._model = AccountModel( db )
+        self._model.dirty.connect( self.dirty )
+        self._model.rowsInserted.connect( self._onRowsInserted )
+        self._sortedmodel = QtCore.QSortFilterProxyModel()
+        self._sortedmodel.setDynamicSortFilter( True )
+        self._sortedmodel.setSourceModel( self._model )
+        self.setModel( self._sortedmodel )
+        if self._pendingExpandAll:
+            self._pendingExpandAll = False
+            super().expandAll()
+
+    def showEvent(self,showEvt):
+        "Build models of pending database when tree view is shown."
+        if self._pendingDb:
+            self._buildModels()
+        super().showEvent(showEvt)
+
+    def expandAll(self):
+        "Expand all accounts, deferred until models got build."
+        if self._pendingDb:
+            self._pendingExpandAll = True
+        else:
+            super().expandAll()
 
     def setDirty(self,isDirty):
         "Set whether model has been altered and may require saving."
@@ -10,8 +10,7 @@ import logging
 from PyQt5 import QtGui, QtWidgets, QtCore
 
 from accounting.core.core import Transaction, Item
-from accounting.core.core import FilterGreaterOrEqualDate, FilterLessOrEqualDate
-from accounting.gui.models import AnyStringFilteredModel
+from accounting.gui.models import AnyStringFilteredModel, SeparatedStringListModel
 
 LOGGER = logging.getLogger(__name__)
 
@@ -66,9 +65,7 @@ class DateDelegate(QtWidgets.QStyledItemDelegate):
 
     def setModelData(self, editor, model, index):
         """Apply data from editor to model."""
-        d = editor.date()
-        d = datetime.date(d.year(), d.month(), d.day())
-        model.setData(index, d)
+        model.setData(index, editor.date().toPyDate())
 
     def sizeHint(self, option, index):
         s = super().sizeHint(option, index)
@@ -175,32 +172,19 @@ class DescriptionDelegate(QtWidgets.QStyledItemDelegate):
         widget.setDuplicatesEnabled(True)
         widget.setEditable(True)
         instance = self.parent().model().data(index, QtCore.Qt.EditRole)
-        strings = []
+        descrs = set()
         dt = datetime.timedelta(days=90)
         if isinstance(instance, Transaction):
-            # get descriptions of items near current item
-            fromDate = instance.date - dt
-            tillDate = instance.date + dt
-            fromFilter = FilterGreaterOrEqualDate(fromDate)
-            tillFilter = FilterLessOrEqualDate(tillDate)
-            for trn in instance.db.filterTransactions(fromFilter & tillFilter):
-                descr = trn.descr
-                if not descr in strings:
-                    strings += [descr]
+            # get descriptions of transactions near current transaction
+            descrs = instance.db.distinctDescriptionsBetween(instance.date - dt, instance.date + dt, Transaction)
         elif isinstance(instance, Item):
-            # get descriptions of items neat current item
-            fromDate = instance.transaction.date - dt
-            tillDate = instance.transaction.date + dt
-            fromFilter = FilterGreaterOrEqualDate(fromDate)
-            tillFilter = FilterLessOrEqualDate(tillDate)
-            for item in instance.db.filterItems(fromFilter & tillFilter):
-                descr = item.descr
-                if descr and not descr in strings:
-                    strings += [descr]
-        strings.sort(key=lambda x: x.lower())
-        widget.addItems(strings)
-        widget.insertItem(0, instance.descr)
-        widget.insertSeparator(1)
+            # get descriptions of items near current item
+            date = instance.transaction.date
+            descrs = instance.db.distinctDescriptionsBetween(date - dt, date + dt, Item)
+            descrs.discard("")
+        strings = [descr for dummyLowered, descr in sorted((d.lower(), d) for d in descrs)]
+        # current description, a separator and all other descriptions
+        widget.setModel(SeparatedStringListModel([instance.descr, ""] + strings, (1,), widget))
         widget.setCurrentIndex(0)
         return widget
 
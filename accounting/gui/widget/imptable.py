@@ -67,12 +67,27 @@ class TransactionImportTable(QtWidgets.QTableView):
             colWidth = hw * factor / fSum
             self.setColumnWidth(colIdx, colWidth)
 
+    def _removeSelectedRows(self):
+        "Remove selected rows, using one model update per contiguous range of rows."
+        rows = sorted({idx.row() for idx in self.selectionModel().selectedRows()}, reverse=True)
+        if not rows:
+            rows = [self.currentIndex().row()]
+        # remove from bottom to top, keeping row numbers of remaining ranges valid
+        last = first = rows[0]
+        for row in rows[1:]:
+            if row == first - 1:
+                first = row
+                continue
+            self.model().removeRows(first, last - first + 1)
+            last = first = row
+        self.model().removeRows(first, last - first + 1)
+
     def keyPressEvent(self, keyEvent):
         "Handle key press event."
         idx = self.currentIndex()
         if idx.isValid():
             if keyEvent.key() == QtCore.Qt.Key_Minus:
-                self.model().removeRow(idx.row())
+                self._removeSelectedRows()
             elif keyEvent.key() == QtCore.Qt.Key_T:
                 self.addAsTransaction.emit()
             elif keyEvent.key() == QtCore.Qt.Key_I:
@@ -29,8 +29,8 @@ class TransactionImportView(QtWidgets.QWidget):
     # add given entry as new transaction
     importEntryAsTransaction = QtCore.pyqtSignal(ImporterEntry)
 
-    # add given entry to transaction
-    importEntryAsItem = QtCore.pyqtSignal(ImporterEntry)
+    # add given list of entries to transaction
+    importEntriesAsItems = QtCore.pyqtSignal(list)
 
     # apply given entry to item
     importEntryToItem = QtCore.pyqtSignal(ImporterEntry)
@@ -85,11 +85,13 @@ class TransactionImportView(QtWidgets.QWidget):
         cb.setChecked( True )
         cb.setToolTip("Values are asset")
         self._kindBtnGrp.addButton( cb, TransactionImportView.KIND_ASSET )
+        self._kindBtnGrp.buttonToggled.connect( self._invalidateCurrImportEntries )
         hboxBtns.addWidget( cb )
         vbox.addLayout( hboxBtns )
         
         self._confirmCb = QtWidgets.QCheckBox("Confirm added/applied item")
         self._confirmCb.setChecked( True )
+        self._confirmCb.toggled.connect( self._invalidateCurrImportEntries )
         vbox.addWidget( self._confirmCb )
         vbox.addSpacing(5)
         self._filterCb = QtWidgets.QRadioButton("Filter transaction(s)")
@@ -117,6 +119,8 @@ class TransactionImportView(QtWidgets.QWidget):
         
         self.setLayout( hbox )
                 
+        self._currEntries = None
+
         self._wizard = TransactionImportWizard()
         self._wizard.accepted.connect( self._wizardAccepted )
         self._wizard.rejected.connect( self.stopImport )
@@ -136,7 +140,14 @@ class TransactionImportView(QtWidgets.QWidget):
         
     def _wizardAccepted(self):
         "User accepted wizard, proceed with import and apply imported entries to our table"
-        self._tbl.setModel( self._wizard.getImporterEntriesModel() )
+        model = self._wizard.getImporterEntriesModel()
+        if model is None:
+            self.stopImport()
+            return
+        self._tbl.setModel( model )
+        self._tbl.selectionModel().selectionChanged.connect( self._invalidateCurrImportEntries )
+        model.rowsRemoved.connect( self._invalidateCurrImportEntries )
+        self._invalidateCurrImportEntries()
         self.show()
     
     def _filterChanged(self,btn):
@@ -146,24 +157,38 @@ class TransactionImportView(QtWidgets.QWidget):
             self.importEntrySelected.emit( entries[0] )
     
     def _currImportEntries(self):
-        "Get instances of ImporterEntry from current selected rows"
-        indices = self._tbl.selectionModel().selectedRows()
-        entries = []
-        for idx in indices:
-            if idx.isValid():
-                entry = self._tbl.model().data( idx, ImporterEntriesModel.EntryRole )
-                entry.setConfirmed( self._confirmCb.isChecked() )
-                if self._kindBtnGrp.checkedId() == TransactionImportView.KIND_DEBIT:
-                    entry.inverseValue()
-                entries += [entry]
-        return entries 
-        
+        """Get copies of ImporterEntry from current selected rows, using current confirm state and value type.
+        The entries of the model and those cached for the current selection are left untouched."""
+        if self._currEntries is None:
+            entries = []
+            model = self._tbl.model()
+            entryRole = ImporterEntriesModel.EntryRole
+            confirmed = self._confirmCb.isChecked()
+            inverse = self._kindBtnGrp.checkedId() == TransactionImportView.KIND_DEBIT
+            # walk selection ranges instead of materializing an index per selected cell,
+            # ranges may overlap and must not yield the same row twice
+            rows = set()
+            for rng in self._tbl.selectionModel().selection():
+                rows.update( range( rng.top(), rng.bottom() + 1 ) )
+            for row in sorted( rows ):
+                entry = model.data( model.index( row, 0 ), entryRole )
+                entry = entry.withInverseValue() if inverse else entry.copy()
+                entry.setConfirmed( confirmed )
+                entries.append( entry )
+            self._currEntries = entries
+        # receivers may modify entries, hand out fresh copies of the cached ones
+        return [entry.copy() for entry in self._currEntries]
+
+    def _invalidateCurrImportEntries(self, *args):
+        "Forget entries of current selection, they get collected again on next request"
+        self._currEntries = None
+
     def _importEntryAsTransaction(self):
         "Trigger adding current selected entry as new transaction"
         entries = self._currImportEntries()
         self.importEntryAsTransaction.emit( entries[0] )
-        for entry in entries[1:]:
-            self.importEntryAsItem.emit( entry )
+        if entries[1:]:
+            self.importEntriesAsItems.emit( entries[1:] )
         
     def _importEntryToItem(self):
         "Trigger applying current selected entry to item"
@@ -171,12 +196,14 @@ class TransactionImportView(QtWidgets.QWidget):
             self.importEntryToItem.emit( entry )
 
     def _importEntryAsItem(self):
-        "Trigger adding current selected entry to transaction"
-        for entry in self._currImportEntries():
-            self.importEntryAsItem.emit( entry )
+        "Trigger adding current selected entries to transaction"
+        entries = self._currImportEntries()
+        if entries:
+            self.importEntriesAsItems.emit( entries )
 
     def stopImport(self):
         "Trigger end of import of transaction data for current account"
         self._tbl.setModel( None )
+        self._invalidateCurrImportEntries()
         self.importDone.emit()
 
@@ -5,7 +5,9 @@ View of account's transactions
 @author: Manuel Koch
 '''
 import os
-from io import StringIO
+import functools
+from operator import attrgetter
+from io import StringIO, BytesIO
 import logging
 
 from PyQt5 import QtGui, QtWidgets, QtCore
@@ -81,13 +83,22 @@ Or paste your data into the text field.""")
         "Return path selected by user, may be empty if user pasted text instead"
         return self._fileEdit.text().strip()
 
+    def getText(self):
+        "Return text pasted by user, may be empty if user selected a file instead"
+        return self._textEdit.toPlainText().strip()
+
     def getFile(self):
         "Returns file like object selected by user for import"
-        path = self._fileEdit.text().strip()
-        txt = self._textEdit.toPlainText().strip()
+        return InputWizardPage.openInput(self.getPath(), self.getText())
+
+    @staticmethod
+    def openInput(path, txt):
+        "Returns file like object for given path or, if path is empty, for given text"
         if path:
             LOGGER.debug("Importing from %s..." % path)
-            return open(path, "rb")
+            # importers decode the whole input at once, read it in one go and release the file
+            with open(path, "rb") as f:
+                return BytesIO(f.read())
         else:
             LOGGER.debug("Importing from text...")
             return StringIO(txt)
@@ -106,14 +117,23 @@ class FormatWizardPage(QtWidgets.QWizardPage):
         self._radiogrp = QtWidgets.QButtonGroup()
         for idx, c in enumerate(self._importers):
             cb = QtWidgets.QRadioButton(c.Meta.descr)
-            cb.setToolTip(u"<b>Example text:</b><br/>" + "<br/>".join(
-                [u"<div style='margin:0px;padding:0px;'>%s</div>" % l for l in c.Meta.example.split("\n")]))
+            cb.setToolTip(FormatWizardPage._tooltip(c))
             vbox.addWidget(cb)
             self._radiogrp.addButton(cb, idx)
         self.setLayout(vbox)
 
         self._radiogrp.buttonClicked.connect(self.completeChanged)
 
+    @staticmethod
+    def _tooltip(importer):
+        "Return tooltip HTML showing example text of given importer class, built once per class"
+        html = getattr(importer.Meta, "_tooltip_html", None)
+        if html is None:
+            html = u"<b>Example text:</b><br/>" + "<br/>".join(
+                [u"<div style='margin:0px;padding:0px;'>%s</div>" % l for l in importer.Meta.example.split("\n")])
+            importer.Meta._tooltip_html = html
+        return html
+
     def isComplete(self):
         "Return whether input of page is complete"
         return self._radiogrp.checkedId() >= 0
@@ -134,6 +154,7 @@ class TransactionImportWizard(QtWidgets.QWizard):
         self.addPage(self._inputPage)
         self._fmtPage = FormatWizardPage(self._importClasses)
         self.addPage(self._fmtPage)
+        self._progress = None
         self.loadSettings()
 
     def accept(self):
@@ -157,21 +178,100 @@ class TransactionImportWizard(QtWidgets.QWizard):
         self._importClasses = (ImporterPlainOldTextDe, ImporterSpardaBank, ImporterIngDiba, ImporterFidorBank)
 
     def getImporterEntriesModel(self):
-        "Return instance of ImporterEntriesModel"
+        "Return instance of ImporterEntriesModel or None if importing failed or got cancelled"
         progress = QtWidgets.QProgressDialog(self)
         progress.setWindowTitle("Importing...")
-        progress.setRange(0, 4)
+        progress.setLabelText("Reading entries...")
+        progress.setRange(0, 0)
         progress.setWindowModality(QtCore.Qt.WindowModal)
-        progress.setValue(0)
-        fileObj = self._inputPage.getFile()
-        LOGGER.debug("Building import entries model from %s" % repr(fileObj))
-        importer = self._fmtPage.getImporter()(fileObj)
-        progress.setValue(1)
-        entries = list(importer.entries())
-        LOGGER.debug("Found %d entries for import" % len(entries))
-        progress.setValue(2)
-        entries.sort(key=lambda e: e.date)
-        progress.setValue(3)
-        model = ImporterEntriesModel(entries)
+        self._progress = progress
+
+        openFile = functools.partial(InputWizardPage.openInput, self._inputPage.getPath(), self._inputPage.getText())
+        worker = _ImportWorker(openFile, self._fmtPage.getImporter())
+        thread = QtCore.QThread()
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        loop = QtCore.QEventLoop()
+        errors = []  # message of exception that aborted parsing, if any
+        worker.progress.connect(self._importProgress)
+        worker.done.connect(loop.quit)
+        worker.error.connect(errors.append)
+        worker.error.connect(loop.quit)
+        # worker's thread is busy parsing, so cancel it directly instead of queued
+        progress.canceled.connect(worker.cancel, QtCore.Qt.DirectConnection)
+        thread.start()
+        loop.exec_()
+        thread.quit()
+        thread.wait()
+
         progress.reset()
-        return model
+        self._progress = None
+        if errors:
+            QtWidgets.QMessageBox.warning(self, self.tr("Import failed"), errors[0])
+            return None
+        if worker.entries is None:
+            return None
+        return ImporterEntriesModel(worker.entries)
+
+    def _importProgress(self, nofEntries):
+        "Show number of entries found so far"
+        if self._progress:
+            self._progress.setLabelText("Found %d entries..." % nofEntries)
+
+
+class _ImportWorker(QtCore.QObject):
+    "Parse entries of an importer in a background thread"
+
+    # number of entries found so far
+    progress = QtCore.pyqtSignal(int)
+
+    # list of entries sorted by date or None when cancelled
+    done = QtCore.pyqtSignal(object)
+
+    # message of exception that aborted parsing
+    error = QtCore.pyqtSignal(str)
+
+    PROGRESS_STEP = 50
+
+    def __init__(self, openFile, importerClass):
+        "Construct worker to parse file like object returned by openFile() using given importer class"
+        super().__init__()
+        self._openFile = openFile
+        self._importerClass = importerClass
+        self._cancelled = False
+        self.entries = None
+
+    def cancel(self):
+        "Request to stop parsing, checked between entries"
+        self._cancelled = True
+
+    @QtCore.pyqtSlot()
+    def run(self):
+        "Parse and sort entries"
+        try:
+            fileObj = self._openFile()
+            LOGGER.debug("Building import entries from %s" % repr(fileObj))
+            importer = self._importerClass(fileObj)
+            entries = []
+            for entry in importer.entries():
+                if self._cancelled:
+                    LOGGER.debug("Import cancelled")
+                    self.done.emit(None)
+                    return
+                entries.append(entry)
+                if len(entries) % _ImportWorker.PROGRESS_STEP == 0:
+                    self.progress.emit(len(entries))
+            LOGGER.debug("Found %d entries for import" % len(entries))
+            order = getattr(self._importerClass.Meta, "sort_order", None)
+            if order == "desc":
+                entries.reverse()
+            elif order != "asc":
+                entries.sort(key=attrgetter("date"))
+            if __debug__ and order and any(a.date > b.date for a, b in zip(entries, entries[1:])):
+                LOGGER.warning("Entries of %s are not in %s order" % (self._importerClass.__name__, order))
+                entries.sort(key=attrgetter("date"))
+            self.entries = entries
+            self.done.emit(entries)
+        except Exception as e:
+            LOGGER.exception("Failed to import entries")
+            self.error.emit(str(e))
@@ -8,10 +8,8 @@ View to display report of account(s)
 import os
 import datetime
 import logging
-import urllib
-import webbrowser
 
-from PyQt5 import QtPrintSupport, QtWidgets, QtCore  # , QtWebKitWidgets
+from PyQt5 import QtPrintSupport, QtGui, QtWidgets, QtCore  # , QtWebKitWidgets
 
 from accounting.core.dateutils import rangeDateFromTillByInterval, INTERVAL_MONTHLY
 from accounting.report import Report, ReportTemplate
@@ -36,6 +34,37 @@ LOGGER = logging.getLogger(__name__)
 #        logFunc("Javascript Console: %s(%d): %s"%(sourceID,lineNumber,message))
 
 
+class _RenderSignals(QtCore.QObject):
+    """Signals of _RenderTask, a QRunnable can't emit signals itself."""
+
+    # path of rendered file
+    finished = QtCore.pyqtSignal(str)
+
+    # message of exception that aborted rendering
+    failed = QtCore.pyqtSignal(str)
+
+
+class _RenderTask(QtCore.QRunnable):
+    """Render report template into file in a background thread."""
+
+    def __init__(self, template, report, outpath):
+        super().__init__()
+        self.signals = _RenderSignals()
+        self._template = template
+        self._report = report
+        self._outpath = outpath
+
+    def run(self):
+        try:
+            with open(self._outpath, "w", encoding="utf-8") as f:
+                self._template.renderInto(self._report, f)
+        except Exception as e:
+            LOGGER.exception("Failed to render report into %s" % self._outpath)
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(self._outpath)
+
+
 class AccountReport(QtWidgets.QWidget):
 
     def __init__(self, accounts):
@@ -43,6 +72,14 @@ class AccountReport(QtWidgets.QWidget):
         super().__init__()
 
         self._template = None
+        self._renderTask = None
+        self._renderProgress = None
+
+        # validate date range once user stopped changing the dates
+        self._rangeTimer = QtCore.QTimer(self)
+        self._rangeTimer.setSingleShot(True)
+        self._rangeTimer.setInterval(300)
+        self._rangeTimer.timeout.connect(self._rangeChanged)
 
         today = datetime.date.today()
         startofmonth, endofmonth = rangeDateFromTillByInterval(today, today, INTERVAL_MONTHLY)
@@ -63,7 +100,7 @@ class AccountReport(QtWidgets.QWidget):
         self._fromDate = QtWidgets.QDateEdit()
         self._fromDate.setCalendarPopup(True)
         self._fromDate.setDate(startofmonth)
-        self._fromDate.dateChanged.connect(self._rangeChanged)
+        self._fromDate.dateChanged.connect(self._rangeTimer.start)
         hbox2.addWidget(QtWidgets.QLabel("From"), alignment=QtCore.Qt.AlignRight)
         hbox2.addWidget(self._fromDate)
         hbox2.addSpacing(40)
@@ -71,7 +108,7 @@ class AccountReport(QtWidgets.QWidget):
         self._tillDate = QtWidgets.QDateEdit()
         self._tillDate.setCalendarPopup(True)
         self._tillDate.setDate(endofmonth)
-        self._tillDate.dateChanged.connect(self._rangeChanged)
+        self._tillDate.dateChanged.connect(self._rangeTimer.start)
         hbox2.addWidget(self._tillDate)
         hbox2.addSpacing(40)
         self._selectBtn = QtWidgets.QPushButton("Select")
@@ -91,12 +128,13 @@ class AccountReport(QtWidgets.QWidget):
 
         self.setLayout(hbox)
 
+    def _currentRange(self):
+        """Return tuple of from/till date selected by user"""
+        return self._fromDate.date().toPyDate(), self._tillDate.date().toPyDate()
+
     def _rangeChanged(self):
         """Handle change of from/till date range"""
-        fd = self._fromDate.date()
-        fd = datetime.date(fd.year(), fd.month(), fd.day())
-        td = self._tillDate.date()
-        td = datetime.date(td.year(), td.month(), td.day())
+        fd, td = self._currentRange()
         valid = fd < td
         self._createBtn.setEnabled(valid)
 
@@ -121,19 +159,44 @@ class AccountReport(QtWidgets.QWidget):
         self.refreshReport()
 
     def refreshReport(self):
-        """Handle refreshing of report rendering."""
-        fd = self._fromDate.date()
-        fd = datetime.date(fd.year(), fd.month(), fd.day())
-        td = self._tillDate.date()
-        td = datetime.date(td.year(), td.month(), td.day())
+        """Handle refreshing of report rendering, the report gets rendered in a background thread."""
+        if self._renderTask is not None:
+            return
+        fd, td = self._currentRange()
         self._report.setRange(fd, td)
-        html = self._template.render(self._report)
         outname = "{}_{}_{}.html".format(fd, td, os.path.splitext(self._template.name)[0])
         outpath = os.path.join(self._template.basepath, outname)
-        with open(outpath, "w+", encoding="utf-8") as f:
-            f.write(html)
-        url = QtCore.QUrl.fromLocalFile(outpath).toString()
-        webbrowser.open(url, new=0, autoraise=True)
+
+        self._createBtn.setEnabled(False)
+        self._renderProgress = QtWidgets.QProgressDialog(self)
+        self._renderProgress.setWindowTitle("Reporting...")
+        self._renderProgress.setLabelText("Rendering report...")
+        self._renderProgress.setCancelButton(None)
+        self._renderProgress.setRange(0, 0)
+        self._renderProgress.setWindowModality(QtCore.Qt.WindowModal)
+        self._renderProgress.show()
+
+        self._renderTask = _RenderTask(self._template, self._report, outpath)
+        self._renderTask.signals.finished.connect(self._renderFinished)
+        self._renderTask.signals.failed.connect(self._renderFailed)
+        QtCore.QThreadPool.globalInstance().start(self._renderTask)
+
+    def _renderDone(self):
+        """Cleanup after rendering in background thread has been done."""
+        self._renderTask = None
+        self._renderProgress.reset()
+        self._renderProgress = None
+        self._rangeChanged()
+
+    def _renderFinished(self, outpath):
+        """Show rendered report."""
+        self._renderDone()
+        QtGui.QDesktopServices.openUrl(QtCore.QUrl.fromLocalFile(outpath))
+
+    def _renderFailed(self, msg):
+        """Tell user that rendering report failed."""
+        self._renderDone()
+        QtWidgets.QMessageBox.warning(self, self.tr("Report failed"), msg)
 
 #    def printReport(self):
 #        dialog = QtPrintSupport.QPrintPreviewDialog()
@@ -35,6 +35,7 @@ class AccountTable(QtWidgets.QTableView):
         (AccountTransactionsModel.COL_DESCR, 2),
         (AccountTransactionsModel.COL_ACC, 1),
     )
+    SPREAD_FACTOR_SUM = sum(f for dummyCol, f in SPREAD_COL_WIDTHS)
 
     # signal change of first/last transaction date
     dateRangeChanged = QtCore.pyqtSignal(datetime.date, datetime.date)
@@ -49,6 +50,8 @@ class AccountTable(QtWidgets.QTableView):
         self._model = None
         self._editOnInsert = True
         self._adjustColumnsOnInsert = False
+        self._adjustColumnsPending = False
+        self._colHintCache = {}
         self.setMinimumWidth(200)
         self.setEditTriggers(self.EditKeyPressed | self.AnyKeyPressed | self.DoubleClicked)
         self.setItemDelegateForColumn(AccountTransactionsModel.COL_DATE, DateDelegate(self))
@@ -73,14 +76,41 @@ class AccountTable(QtWidgets.QTableView):
         """Adjust width of all columns to use all available space."""
         hw = self.horizontalHeader().size().width()
         for c in AccountTable.MIN_COL_WIDTHS:
-            cw = self.sizeHintForColumn(c)
+            cw = self._colHintCache.get(c)
+            if cw is None:
+                cw = self._colHintCache[c] = self.sizeHintForColumn(c)
             hw -= cw
             self.setColumnWidth(c, cw)
-        fSum = sum([w[1] for w in AccountTable.SPREAD_COL_WIDTHS])
         for c, f in AccountTable.SPREAD_COL_WIDTHS:
-            cw = hw * f / fSum
+            cw = hw * f / AccountTable.SPREAD_FACTOR_SUM
             self.setColumnWidth(c, cw)
 
+    def _invalidateColHints(self, *args):
+        """Forget cached size hints of all columns."""
+        self._colHintCache.clear()
+
+    def _onDataChanged(self, topLeft, bottomRight, roles=None):
+        """Forget cached size hints of changed columns."""
+        for c in range(topLeft.column(), bottomRight.column() + 1):
+            self._colHintCache.pop(c, None)
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QtCore.QEvent.FontChange:
+            self._invalidateColHints()
+
+    def _scheduleAdjustColumnWidths(self):
+        """Adjust column widths when control returns to event loop, collapsing multiple requests into one."""
+        if not self._adjustColumnsPending:
+            self._adjustColumnsPending = True
+            QtCore.QTimer.singleShot(0, self._adjustPendingColumnWidths)
+
+    def _adjustPendingColumnWidths(self):
+        """Adjust column widths as requested by _scheduleAdjustColumnWidths()."""
+        self._adjustColumnsPending = False
+        self._colHintCache = {}
+        self.adjustColumnWidths()
+
     def keyPressEvent(self, keyEvent):
         """Handle key press event."""
         isCtrl = QtWidgets.QApplication.keyboardModifiers() & QtCore.Qt.ControlModifier
@@ -105,6 +135,12 @@ class AccountTable(QtWidgets.QTableView):
         self._model.dirty.connect(self.dirty)
         self._model.rowsInserted.connect(self._onRowsInserted)
         self._model.rowsMoved.connect(self._onRowsMoved)
+        self._model.layoutChanged.connect(self._onLayoutChanged)
+        self._model.dataChanged.connect(self._onDataChanged)
+        for signal in (self._model.modelReset, self._model.layoutChanged,
+                       self._model.rowsInserted, self._model.rowsRemoved):
+            signal.connect(self._invalidateColHints)
+        self._invalidateColHints()
         self._model.dateRangeChanged.connect(self.dateRangeChanged)
         fromDate, tillDate = self._model.getDateRange()
         if fromDate and tillDate:
@@ -117,21 +153,27 @@ class AccountTable(QtWidgets.QTableView):
     def _onRowsInserted(self, idx, firstRow, lastRow):
         """React on insertion of new rows."""
         if self._adjustColumnsOnInsert:
-            self.adjustColumnWidths()
+            self._scheduleAdjustColumnWidths()
             self._adjustColumnsOnInsert = False
 
         self.selectRow(firstRow)
         idx = self.model().index(firstRow, AccountTransactionsModel.COL_DESCR)
-        rowType = self.model().data(idx, AccountTransactionsModel.RowTypeRole)
+        rowType = self.model().rowType(firstRow)
         if rowType == AccountTransactionsModel.RowTypeTransaction:
             self.scrollTo(idx, AccountTable.PositionAtCenter)
         if self._editOnInsert:
             self.edit(idx)
 
+    def _onLayoutChanged(self, parents=None, hint=None):
+        """React on bulk changes of rows."""
+        if self._adjustColumnsOnInsert and self.model().rowCount():
+            self._scheduleAdjustColumnWidths()
+            self._adjustColumnsOnInsert = False
+
     def _onRowsMoved(self, srcIdx, firstRow, lastRow, dstIdx, destRow):
         """React on moved rows."""
         idx = self.model().index(destRow, AccountTransactionsModel.COL_DESCR)
-        rowType = self.model().data(idx, AccountTransactionsModel.RowTypeRole)
+        rowType = self.model().rowType(destRow)
         if rowType == AccountTransactionsModel.RowTypeTransaction:
             self.scrollTo(idx, AccountTable.PositionAtCenter)
 
@@ -174,6 +216,10 @@ class AccountTable(QtWidgets.QTableView):
         """Add new item using given values"""
         self.model().addTransactionItem(self.currentIndex(), **kwargs)
 
+    def addItems(self, items):
+        """Add new items using given list of dicts of values"""
+        self.model().addTransactionItems(self.currentIndex(), items)
+
     def changeTransactionItem(self, **kwargs):
         """Add new item to current transaction using given values"""
         self.model().changeTransactionItem(self.currentIndex(), **kwargs)
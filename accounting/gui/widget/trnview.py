@@ -5,6 +5,7 @@ View of account's transactions
 @author: Manuel Koch
 '''
 import datetime
+import functools
 import re
 import logging
 
@@ -20,6 +21,12 @@ from accounting.core import dateutils
 LOGGER = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=64)
+def _compile_descr(descr):
+    "Return compiled case-insensitive regexp matching given text literally"
+    return re.compile(re.escape(descr), re.IGNORECASE)
+
+
 class DateRange(QtWidgets.QWidget):
     dateClicked = QtCore.pyqtSignal(datetime.date)
 
@@ -31,19 +38,22 @@ class DateRange(QtWidgets.QWidget):
         self.setMinimumWidth(DateRange.WIDTH)
         self._from = None
         self._till = None
+        self._totalSecs = 0
         self._font = QtGui.QFont()
         self._font.setPointSize(10)
-        self._labelHeight = 0
+        # all labels share font, thus their height
+        self._labelHeight = QtGui.QFontMetrics(self._font).height()
 
     def mousePressEvent(self, mouseEvent):
         super().mousePressEvent(mouseEvent)
+        if not self._from or not self._till:
+            return
         f = float(mouseEvent.y()) / self.height()
         if f <= 0.05:
             f = 0
         elif f >= 0.95:
             f = 1.0
-        secs = (self._till - self._from).total_seconds()
-        d = self._from + datetime.timedelta(seconds=secs * f)
+        d = self._from + datetime.timedelta(seconds=self._totalSecs * f)
         self.dateClicked.emit(d)
 
     def paintEvent(self, evt):
@@ -55,58 +65,43 @@ class DateRange(QtWidgets.QWidget):
         painter.setFont(self._font)
         painter.setRenderHint(QtGui.QPainter.Antialiasing);
 
-        dt = self._till - self._from
-        step = datetime.timedelta(days=1)
-        d = self._from
+        totalSecs = self._totalSecs
         flags = QtCore.Qt.AlignHCenter | QtCore.Qt.AlignVCenter
+        h = self._labelHeight
         label_data = []
-        last_t = None
-        while d <= self._till:
-            if dt:
-                f = (d - self._from).total_seconds() / dt.total_seconds()
-            else:
-                f = 0
+        # one label per month, placed at first day of month or start of range
+        months = (self._till.year - self._from.year) * 12 + self._till.month - self._from.month + 1
+        year, month = self._from.year, self._from.month
+        for dummyIdx in range(months):
+            d = max(datetime.date(year, month, 1), self._from)
+            f = (d - self._from).total_seconds() / totalSecs if totalSecs else 0
             t = d.strftime("%b %Y")
-            if t != last_t:
-                h = painter.boundingRect(0, 0, self.width(), 20, QtCore.Qt.AlignLeft | QtCore.Qt.AlignTop, t).height()
-                y = int(self.height() * f)
-                if y - h / 2 < 0:
-                    y = h / 2
-                elif y + h / 2 > self.height():
-                    y = self.height() - h / 2
-                last_t = t
-                label_data.append((t, y, h))
-            d += step
-
-        print("lower half")
-        i = 1
-        while i < len(label_data) // 2:
-            prev_y = label_data[i - 1][1]
-            prev_h = label_data[i - 1][2]
-            y = label_data[i][1]
-            overlap = (prev_y + prev_h) > y
-            print(i, y, prev_y, prev_h, overlap)
-            if overlap:
-                print("drop", i)
-                label_data.pop(i)
-            else:
-                i += 1
-
-        print("upper half")
-        i = -2
-        while i > (-len(label_data) // 2):
-            prev_y = label_data[i + 1][1]
-            prev_h = label_data[i + 1][2]
-            y = label_data[i][1]
-            overlap = (prev_y - prev_h) < y
-            print(i, y, prev_y, prev_h, overlap)
-            if overlap:
-                print("drop", i)
-                label_data.pop(i)
-            else:
-                i -= 1
-
-        for t, y, h in label_data:
+            y = int(self.height() * f)
+            if y - h / 2 < 0:
+                y = h / 2
+            elif y + h / 2 > self.height():
+                y = self.height() - h / 2
+            label_data.append((t, y, h))
+            month += 1
+            if month > 12:
+                year, month = year + 1, 1
+
+        # keep labels top to bottom that don't overlap the recently kept one,
+        # the label at end of range is kept too, dropping kept labels it overlaps
+        kept = []
+        last_bottom = float("-inf")
+        for label in label_data:
+            dummyText, y, h = label
+            if y - h / 2 >= last_bottom:
+                kept.append(label)
+                last_bottom = y + h / 2
+        if label_data and kept[-1] is not label_data[-1]:
+            t, y, h = label_data[-1]
+            while len(kept) > 1 and kept[-1][1] + kept[-1][2] / 2 > y - h / 2:
+                kept.pop()
+            kept.append(label_data[-1])
+
+        for t, y, h in kept:
             painter.drawText(0, y - h / 2, self.width(), h, flags, t)
 
         painter.end()
@@ -114,6 +109,7 @@ class DateRange(QtWidgets.QWidget):
     def setDateRange(self, fromDate, tillDate):
         self._from = fromDate if fromDate is not None and fromDate < datetime.date.max else None
         self._till = tillDate if tillDate is not None and tillDate > datetime.date.min else None
+        self._totalSecs = (self._till - self._from).total_seconds() if self._from and self._till else 0
         self.update()
 
 
@@ -143,7 +139,8 @@ class TransactionFilterWidget(QtWidgets.QWidget):
                                    self.DATE_RANGE_CURR_YEAR])
         self._rangeCombo.setCurrentText(self.DATE_RANGE_LAST_90_DAYS)
         self._rangeCombo.setEditable(False)
-        self._rangeCombo.currentTextChanged.connect(self._filterChanged)
+        # range selection is discrete, use shorter delay than for text input
+        self._rangeCombo.currentTextChanged.connect(lambda: self._delayTimer.start(150))
         self._descrText = QtWidgets.QLineEdit()
         self._descrText.setMinimumWidth(300)
         self._descrText.textChanged.connect(lambda: self._delayTimer.start(300))
@@ -159,37 +156,42 @@ class TransactionFilterWidget(QtWidgets.QWidget):
         self.filterChanged.emit(self.getFilter())
 
     def getFilter(self):
+        value = str(self._valueText.text()).strip()
         try:
-            value = str(self._valueText.text()).strip()
-            if value:
-                value = to_decimal(value)
-            else:
-                value = None
-        except:
+            # value may be an arithmetic expression too
+            value = to_decimal(value) if value else None
+        except (ArithmeticError, ValueError):
             value = None
         descr = str(self._descrText.text()).strip()
 
         today = datetime.date.today()
         filter_ = CombinedFilter()
+        constrained = False
 
         if value is not None:
             filter_ = filter_ & FilterEqualValue(value)
+            constrained = True
 
         if descr:
-            regexp = re.compile(re.escape(descr), re.IGNORECASE)
+            regexp = _compile_descr(descr)
             filter_ = filter_ & FilterRegexpDescr(regexp)
+            constrained = True
 
         if self._rangeCombo.currentText() == self.DATE_RANGE_CURR_MONTH:
             start_ts = dateutils.startofmonth(today)
             filter_ = filter_ & FilterGreaterOrEqualDate(start_ts)
+            constrained = True
         elif self._rangeCombo.currentText() == self.DATE_RANGE_LAST_90_DAYS:
             start_ts = today - datetime.timedelta(days=90)
             filter_ = filter_ & FilterGreaterOrEqualDate(start_ts)
+            constrained = True
         elif self._rangeCombo.currentText() == self.DATE_RANGE_CURR_YEAR:
             start_ts = dateutils.startofyear(today)
             filter_ = filter_ & FilterGreaterOrEqualDate(start_ts)
+            constrained = True
 
-        return filter_
+        # without any constraint there is no need to filter at all
+        return filter_ if constrained else None
 
     def show(self):
         super().show()
@@ -216,7 +218,7 @@ class AccountTransactionView(QtWidgets.QWidget):
         self._importView.importEntrySelected.connect(self._importEntrySelected)
         self._importView.importEntryDeselected.connect(self._importEntryDeselected)
         self._importView.importEntryAsTransaction.connect(self._importEntryAsTransaction)
-        self._importView.importEntryAsItem.connect(self._importEntryAsItem)
+        self._importView.importEntriesAsItems.connect(self._importEntriesAsItems)
         self._importView.importEntryToItem.connect(self._importEntryToItem)
         self._importView.hide()
         vbox.addWidget(self._importView)
@@ -251,7 +253,6 @@ class AccountTransactionView(QtWidgets.QWidget):
         "Handle end of import"
         self._importView.hide()
         self._filterWidget.show()
-        self._acctbl.applyFilter(None)
         self._acctbl.applyFilter(self._filterWidget.getFilter())
 
     def toggleFiltering(self):
@@ -308,9 +309,9 @@ class AccountTransactionView(QtWidgets.QWidget):
         self._acctbl.addTransaction(date=entry.date, descr=entry.descr,
                                     value=entry.value, confirmed=entry.confirmed)
 
-    def _importEntryAsItem(self, entry):
-        self._acctbl.addItem(descr=entry.descr,
-                             value=entry.value, confirmed=entry.confirmed)
+    def _importEntriesAsItems(self, entries):
+        self._acctbl.addItems([dict(descr=entry.descr, value=entry.value, confirmed=entry.confirmed)
+                               for entry in entries])
 
     def _importEntryToItem(self, entry):
         self._acctbl.changeTransactionItem(date=entry.date, descr=entry.descr,
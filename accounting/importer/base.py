@@ -6,6 +6,7 @@ Base class to provide interface of importer class for accounting package.
 '''
 import codecs
 import datetime
+import functools
 import locale
 import babel.numbers
 import babel.plural  # need this import for PyInstaller bundled application
@@ -20,6 +21,13 @@ DATE_FORMATS = ("%Y-%m-%d", "%d.%m.%Y",
                 "%m-%d", "%d.%m.")
 
 
+@functools.lru_cache(maxsize=16)
+def _decimal_symbols(localename):
+    """Return tuple of group and decimal symbol of given named locale."""
+    loc = babel.Locale.parse(localename)
+    return babel.numbers.get_group_symbol(loc), babel.numbers.get_decimal_symbol(loc)
+
+
 class ImportException(Exception):
     pass
 
@@ -64,6 +72,18 @@ class ImporterEntry(object):
         """Inverse current value"""
         self._value *= -1
 
+    def copy(self):
+        """Return a copy of this entry."""
+        other = ImporterEntry(self._date, self._descr, self._value)
+        other._confirmed = self._confirmed
+        return other
+
+    def withInverseValue(self):
+        """Return a copy of this entry having the inverse value."""
+        other = self.copy()
+        other._value = -self._value
+        return other
+
     @property
     def confirmed(self):
         return self._confirmed
@@ -74,19 +94,24 @@ class ImporterEntry(object):
     def __repr__(self):
         return "%s %s %s" % (self._date, self._value, self._descr)
 
+    # index of recently matching date format, input usually uses the same format for all entries
+    _lastDateFormat = 0
+
     @staticmethod
     def date_from_string(s):
         """Return date converted from given string"""
-        for f in DATE_FORMATS:
+        last = ImporterEntry._lastDateFormat
+        for i in [last] + [i for i in range(len(DATE_FORMATS)) if i != last]:
             try:
-                dt = datetime.datetime.strptime(s, f)
-                if dt.year == 1900:
-                    dt = dt.replace(year=datetime.datetime.now().year)
-                    if dt > datetime.datetime.now():
-                        dt = dt.replace(year=datetime.datetime.now().year - 1)
-                return dt.date()
-            except:
-                pass
+                dt = datetime.datetime.strptime(s, DATE_FORMATS[i])
+            except ValueError:
+                continue
+            ImporterEntry._lastDateFormat = i
+            if dt.year == 1900:
+                dt = dt.replace(year=datetime.datetime.now().year)
+                if dt > datetime.datetime.now():
+                    dt = dt.replace(year=datetime.datetime.now().year - 1)
+            return dt.date()
         raise DateException("Unknown date format:" + s)
 
     @staticmethod
@@ -96,7 +121,8 @@ class ImporterEntry(object):
         try:
             if not localename:
                 localename = locale.getlocale()
-            return to_decimal(babel.numbers.parse_decimal(s, localename))
+            group, decimal = _decimal_symbols(localename)
+            return to_decimal(Decimal(s.replace(group, "").replace(decimal, ".")))
         except:
             LOGGER.exception("Failed to convert to decimal")
             raise ValueException("Unknown value format:" + s)
@@ -109,6 +135,8 @@ class ImporterBase(object):
     class Meta:
         descr = "Short description of this importer"
         example = "Example of formatted text that this importer can parse"
+        # order of dates of yielded entries: "asc", "desc" or None when unknown
+        sort_order = None
 
     def __init__(self, inputFileObj):
         """Construct importer instance for given file like object."""
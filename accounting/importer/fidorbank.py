@@ -4,12 +4,11 @@ Derived importer class to import entries from
     Fidor Bank
 file.
 '''
-import codecs
+import io
 import logging
-from io import StringIO
 
 from accounting.importer.base import ImporterBase, ImporterEntry
-from accounting.importer.tsv import CharSepararedValues
+from accounting.importer.tsv import CharSepararedValues, row_field
 
 LOGGER = logging.getLogger(__name__)
 
@@ -25,9 +24,7 @@ class ImporterFidorBank(ImporterBase):
 
     def __init__(self, inputFileObj):
         """Construct importer instance for given tab-separated-values format file like object."""
-        readerClass = codecs.getreader("Latin-1")
-        reader = readerClass(inputFileObj)
-        strFileObj = StringIO(reader.read())
+        strFileObj = io.TextIOWrapper(inputFileObj, encoding="latin-1", newline="")
         self._rows = self._readRowsWithGuessedSeparator(strFileObj)
         self._dateField = 0
         self._descrField = (1, 2)
@@ -36,15 +33,11 @@ class ImporterFidorBank(ImporterBase):
         super().__init__(strFileObj)
 
     def _readRowsWithGuessedSeparator(self, inputFileObj):
-        rows = []
-        cols = 0
-        for sep in (";", "\t"):
-            sepRows = list(CharSepararedValues(sep, inputFileObj))
-            sepCols = sum([len(r) for r in sepRows])
-            if sepCols > cols:
-                rows = sepRows
-                cols = sepCols
-        return rows
+        # guess separator from first line, parse input just once
+        inputFileObj.seek(0)
+        first = inputFileObj.readline()
+        sep = ";" if first.count(";") >= first.count("\t") else "\t"
+        return list(CharSepararedValues(sep, inputFileObj))
 
     def entries(self):
         """Returns iterator of import entries build from current input."""
@@ -53,17 +46,10 @@ class ImporterFidorBank(ImporterBase):
             if len(row) <= maxFieldIndex:
                 continue
 
-            def field(idx):
-                if isinstance(idx, tuple):
-                    return u"  ".join([field(i) for i in idx]).strip()
-                if 0 <= idx < len(row):
-                    return row[idx]
-                return u""
-
             try:
-                date = ImporterEntry.date_from_string(field(self._dateField))
-                descr = field(self._descrField)
-                value = ImporterEntry.decimal_from_string(field(self._valueField), self._valueLocale)
+                date = ImporterEntry.date_from_string(row_field(row, self._dateField))
+                descr = u"  ".join([row_field(row, i) for i in self._descrField]).strip()
+                value = ImporterEntry.decimal_from_string(row_field(row, self._valueField), self._valueLocale)
                 entry = ImporterEntry(date, descr, value)
                 if entry.date and entry.value:
                     LOGGER.debug("Import found entry: %s" % entry)
@@ -11,6 +11,7 @@ from accounting.importer.base import ImporterEntry
 
 class ImporterPlainOldText(accounting.importer.base.ImporterBase):
     ITEM_RE = re.compile(r"\s*(?P<descr>.+)\s+(?P<value>-?\d+([,\.](\d+|-))?)")
+    DATE_LIKE_RE = re.compile(r"^\d{1,4}[-.]\d{1,2}([-.]\d{0,4})?\.?$")
 
     class Meta:
         descr = "Import entries from plain text file"
@@ -31,11 +32,13 @@ class ImporterPlainOldText(accounting.importer.base.ImporterBase):
                 break
             line = line.strip()
 
-            try:
-                recentDate = ImporterEntry.date_from_string(line)
-                continue
-            except:
-                pass
+            if ImporterPlainOldText.DATE_LIKE_RE.match(line):
+                # only lines looking like a date are worth trying to parse as date
+                try:
+                    recentDate = ImporterEntry.date_from_string(line)
+                    continue
+                except:
+                    pass
             if not recentDate:
                 continue
 
@@ -4,12 +4,11 @@ Derived importer class to import entries from
     Sparda Bank
 file.
 '''
-import codecs
+import io
 import logging
-from io import StringIO
 
 from accounting.importer.base import ImporterBase, ImporterEntry
-from accounting.importer.tsv import CharSepararedValues
+from accounting.importer.tsv import CharSepararedValues, row_field
 
 LOGGER = logging.getLogger(__name__)
 
@@ -22,12 +21,11 @@ class ImporterSpardaBank(ImporterBase):
 03.06.2013\t03.06.2013\tPost\t10,00\tEUR
 05.06.2013\t05.06.2013\tAmazon\t30,15\tEUR
 """
+        sort_order = "asc"
 
     def __init__(self, inputFileObj):
         """Construct importer instance for given tab-separated-values format file like object."""
-        readerClass = codecs.getreader("Latin-1")
-        reader = readerClass(inputFileObj)
-        strFileObj = StringIO(reader.read())
+        strFileObj = io.TextIOWrapper(inputFileObj, encoding="latin-1", newline="")
         self._rows = self._readRowsWithGuessedSeparator(strFileObj)
         self._dateField = 0
         self._descrField = 2
@@ -36,39 +34,33 @@ class ImporterSpardaBank(ImporterBase):
         super().__init__(strFileObj)
 
     def _readRowsWithGuessedSeparator(self, inputFileObj):
-        rows = []
-        cols = 0
-        for sep in (";", "\t"):
-            sepRows = list(CharSepararedValues(sep, inputFileObj))
-            sepCols = sum([len(r) for r in sepRows])
-            if sepCols > cols:
-                rows = sepRows
-                cols = sepCols
-        return rows
+        # guess separator from first line, parse input just once
+        inputFileObj.seek(0)
+        first = inputFileObj.readline()
+        sep = ";" if first.count(";") >= first.count("\t") else "\t"
+        return list(CharSepararedValues(sep, inputFileObj))
 
     def entries(self):
         """Returns iterator of import entries build from current input."""
+        entries = self._parsedEntries()
+        next(entries, None)  # first entry is just a summary - no real data
+        yield from entries
+
+    def _parsedEntries(self):
+        """Returns iterator of all import entries parsed from current rows."""
         maxFieldIndex = max(self._dateField, self._descrField, self._valueField)
-        firstEntry = True
         for row in self._rows:
             if len(row) <= maxFieldIndex:
                 continue
 
-            def field(idx):
-                if idx >= 0 and idx < len(row):
-                    return row[idx]
-                return u""
-
             try:
-                date = ImporterEntry.date_from_string(field(self._dateField))
-                descr = field(self._descrField)
-                value = ImporterEntry.decimal_from_string(field(self._valueField), self._valueLocale)
+                date = ImporterEntry.date_from_string(row_field(row, self._dateField))
+                descr = row_field(row, self._descrField)
+                value = ImporterEntry.decimal_from_string(row_field(row, self._valueField), self._valueLocale)
                 entry = ImporterEntry(date, descr, value)
                 if entry.date and entry.value:
                     LOGGER.debug("Import found entry: %s" % entry)
-                    if not firstEntry:  # first entry is just a summary - no real data
-                        yield entry
-                    firstEntry = False
+                    yield entry
             except:
                 LOGGER.exception(u"Import for line failed: %s", row)
                 pass
@@ -5,11 +5,17 @@ Derived class to provide import from tab-separated-values formatted file.
 @author: Manuel Koch
 '''
 import os
+import csv
 import logging
 
 LOGGER = logging.getLogger(__name__)
 
 
+def row_field(row, idx):
+    """Return field of row at given index or empty string when index is out of range."""
+    return row[idx] if 0 <= idx < len(row) else ""
+
+
 class CharSepararedValues(object):
 
     def __init__(self, separator, inputFileObj):
@@ -17,33 +23,31 @@ class CharSepararedValues(object):
         self._separator = separator
         self._input = inputFileObj
 
+    def _quotechar(self):
+        """Return quote character used by fields of first line, double quote unless single quotes are used instead"""
+        self._input.seek(0, os.SEEK_SET)
+        fields = [f.strip() for f in self._input.readline().split(self._separator)]
+        single = sum(1 for f in fields if f.startswith("'"))
+        double = sum(1 for f in fields if f.startswith('"'))
+        return "'" if single > double else '"'
+
     def _readrow(self):
         """Yield rows from given file like object"""
+        quotechar = self._quotechar()
         self._input.seek(0, os.SEEK_SET)
+        reader = csv.reader(self._input, delimiter=self._separator, quotechar=quotechar, skipinitialspace=True)
+        strip = str.strip
+
         while True:
-            line = self._input.readline()
-            if not line:
+            try:
+                fields = next(reader)
+            except StopIteration:
                 break
-            line = line.strip()
-            fields = [u""]
-            quotes = []
-            for char in line:
-                inQuote = bool(len(quotes) % 2)
-                if inQuote and char in quotes[-1]:
-                    quotes.pop()
-                elif not inQuote and char in ('"', "'"):
-                    quotes += [char]
-                elif char == self._separator:
-                    fields += [""]
-                else:
-                    fields[-1] += char
-
-            def unqoute(txt):
-                if (txt.startswith(u"'") and txt.endswith(u"'")) or (txt.startswith(u'"') and txt.endswith(u'"')):
-                    return txt[1:-1].strip()
-                return txt.strip()
-
-            yield [unqoute(f.strip()) for f in fields]
+            except csv.Error:
+                LOGGER.warning("Skipping malformed line %d", reader.line_num)
+                continue
+            # csv reader already removed the quotes
+            yield [strip(f) for f in fields]
 
     def __iter__(self):
         return self._readrow()
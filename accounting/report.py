@@ -5,25 +5,36 @@ Created on 28.04.2013
 @author: manuel
 '''
 import os
-import itertools
+import bisect
+import heapq
+from collections import defaultdict
 from functools import total_ordering
+from operator import attrgetter
 
 import jinja2
 from decimal import Decimal
 
 from accounting.core.core import Database, Account, Item, FilterAccountTypes
-from accounting.core.core import FilterGreaterOrEqualDate, FilterLessOrEqualDate
 from accounting.core.core import FilterAccounts, FilterAccountsAndChildren, FilterNotAccountsAndChildren
 from accounting.core.dateutils import rangeDateFromTillByInterval, INTERVAL_MONTHLY
 from accounting.core.dateutils import getIntervalDescr, getIntervalSteps
 
+_ZERO = Decimal(0)
+_KEY_DATE = attrgetter("date")
+_KEY_VALUE = attrgetter("value")
+
 
 class ItemGrouping(object):
     """Base class to group multiple items by criteria."""
 
     def __init__(self):
-        self._groups = {}
-        self._items = []
+        self._items = {}  # used as insertion ordered set of items
+        self._unsorted = set()  # keys of groups that got items added since they were sorted
+        self._initGroups()
+
+    def _initGroups(self):
+        """Initialize groups of an empty grouping. Derived classes may overwrite this method."""
+        self._groups = defaultdict(list)
 
     def _getGroupKey(self, item):
         """Get a group key for given report item. Derived classes must overwrite this method."""
@@ -38,26 +49,37 @@ class ItemGrouping(object):
     def __iadd__(self, other):
         """Add instance to grouping."""
         if isinstance(other, Item):
-            if not other in self:
+            if other not in self._items:
                 key = self._getGroupKey(other)
-                if not key in self._groups:
-                    self._groups[key] = []
                 self._groups[key].append(other)
-                self._items.append(other)
+                self._items[other] = None
+                self._unsorted.add(key)
         elif isinstance(other, Report):
-            for item in other.items:
-                self += item
+            self._addItems(other.items)
         else:
             raise TypeError()
         return self
 
+    def _addItems(self, items):
+        """Add all given items to grouping."""
+        groups = self._groups
+        known = self._items
+        unsorted = self._unsorted
+        getGroupKey = self._getGroupKey
+        for item in items:
+            if item not in known:
+                key = getGroupKey(item)
+                groups[key].append(item)
+                known[item] = None
+                unsorted.add(key)
+
     def __isub__(self, other):
         """Remove instance from grouping."""
         if isinstance(other, Item):
-            if other in self:
+            if other in self._items:
                 key = self._getGroupKey(other)
                 self._groups[key].remove(other)
-                self._items.remove(other)
+                del self._items[other]
         elif isinstance(other, Report):
             for item in other.items:
                 self -= item
@@ -67,27 +89,50 @@ class ItemGrouping(object):
 
     def clear(self):
         """Clear grouping."""
-        self._groups = {}
-        self._items = []
+        self._items = {}
+        self._unsorted = set()
+        self._initGroups()
+
+    def bulkBuild(self, items):
+        """Rebuild grouping from given items at once."""
+        self.clear()
+        self._addItems(items)
 
     def groups(self):
         """Return list of groupings."""
         return self._groups.keys()
 
+    def _sortGroup(self, items):
+        """Sort list of items of a group in place. Derived classes may overwrite this method."""
+
+    def itemsByGroup(self):
+        """Return iterator for tuples of grouping key and list of its items."""
+        for key in self._unsorted:
+            self._sortGroup(self._groups[key])
+        self._unsorted.clear()
+        return iter(self._groups.items())
+
     def groupItems(self, key, filter_=None):
         """Return items for selecting grouping key that match given filter"""
+        if key not in self._groups:
+            raise KeyError(key)  # don't let lookup create an empty group
+        if key in self._unsorted:
+            self._sortGroup(self._groups[key])
+            self._unsorted.discard(key)
         if filter_ is None:
             return iter(self._groups[key])
         else:
-            return itertools.filterfalse(filter_.rejected, self._groups[key])
+            return iter(filter_.acceptedMany(self._groups[key]))
 
 
 @total_ordering
 class DateRangeKey(object):
+    __slots__ = ("_interval", "_fromDate", "_tillDate", "_hash")
 
     def __init__(self, fromDate, tillDate, interval):
         self._interval = interval
         self._fromDate, self._tillDate = rangeDateFromTillByInterval(fromDate, tillDate, self._interval)
+        self._hash = hash((self._fromDate, self._tillDate))
 
     def __repr__(self):
         return "%s...%s" % (self._fromDate, self._tillDate)
@@ -106,27 +151,66 @@ class DateRangeKey(object):
         return self._fromDate < other._fromDate
 
     def __hash__(self):
-        return hash((self._fromDate, self._tillDate))
+        return self._hash
 
 
 class ItemGroupingByDateRange(ItemGrouping):
     """Group multiple report items by date range."""
 
     def __init__(self, fromDate, tillDate, interval):
-        super().__init__()
         self._fromDate = fromDate
         self._tillDate = tillDate
         self._interval = interval
+        self._keyByDate = {}  # group key by date of item
 
-        # make sure we have a list for every date range
-        for i in getIntervalSteps(self._fromDate, self._tillDate, self._interval):
-            key = DateRangeKey(i, i, self._interval)
+        self._keys = [DateRangeKey(i, i, self._interval)
+                      for i in getIntervalSteps(self._fromDate, self._tillDate, self._interval)]
+        self._keys.sort()
+        self._keyStarts = [key._fromDate for key in self._keys]
+        super().__init__()
+
+    def _initGroups(self):
+        """Initialize groups of an empty grouping, making sure we have a list for every date range."""
+        super()._initGroups()
+        for key in self._keys:
             self._groups[key] = []
 
     def _getGroupKey(self, item):
         """Get a group key for given item."""
         d = item.date
-        return DateRangeKey(d, d, self._interval)
+        key = self._keyByDate.get(d)
+        if key is None:
+            # look up date range containing date, only dates out of range need a new key
+            idx = bisect.bisect_right(self._keyStarts, d) - 1
+            if idx >= 0 and d <= self._keys[idx]._tillDate:
+                key = self._keys[idx]
+            else:
+                key = DateRangeKey(d, d, self._interval)
+            self._keyByDate[d] = key
+        return key
+
+    def _addItems(self, items):
+        """Add all given items to grouping, looking up the group key once per distinct date.
+        Items get appended in order of their date, groups only need sorting later
+        when they already had items of a later date."""
+        known = self._items
+        itemsByDate = defaultdict(list)
+        for item in items:
+            if item not in known:
+                known[item] = None
+                itemsByDate[item.date].append(item)
+        groups = self._groups
+        for d in sorted(itemsByDate):
+            dateItems = itemsByDate[d]
+            key = self._getGroupKey(dateItems[0])
+            group = groups[key]
+            if group and group[-1].date > d:
+                self._unsorted.add(key)
+            group.extend(dateItems)
+
+    def _sortGroup(self, items):
+        """Sort list of items of a group by date, keeping order of items of same date."""
+        items.sort(key=_KEY_DATE)
 
     def groups(self):
         """Return list of groupings."""
@@ -137,6 +221,7 @@ class ItemGroupingByDateRange(ItemGrouping):
 
 class ReportDatasetValue(object):
     """A value within a group"""
+    __slots__ = ("_label", "_value", "_items", "_grp", "_rgb")
 
     def __init__(self, label, value, items):
         """Construct a group"""
@@ -186,11 +271,14 @@ class ReportDatasetValue(object):
 
 class ReportDatasetGroup(object):
     """A group within a dataset"""
+    __slots__ = ("_label", "_values", "_known", "_sum")
 
     def __init__(self, label):
         """Construct a group"""
         self._label = label
         self._values = []
+        self._known = set()  # values of group, for fast membership test
+        self._sum = _ZERO
 
     def __repr__(self):
         return str(self._label)
@@ -201,8 +289,10 @@ class ReportDatasetGroup(object):
     def __iadd__(self, other):
         """Add instance to group."""
         if isinstance(other, ReportDatasetValue):
-            if not other in self._values:
-                self._values += [other]
+            if other not in self._known:
+                self._values.append(other)
+                self._known.add(other)
+                self._sum += other.value
                 other._grp = self
         else:
             raise TypeError("Dont know how to handle %s" % type(other))
@@ -220,18 +310,21 @@ class ReportDatasetGroup(object):
     def sorted(self, maxNof=0):
         """Return sorted list of values in descending order. Only return max number of values if requested."""
         vals = [v for v in self._values if v.value]
-        vals.sort(key=lambda v: v.value, reverse=True)
         if maxNof and len(vals) > maxNof:
-            vals, other = vals[:maxNof - 1], vals[maxNof + 1:]
-            sumOther = sum([v.value for v in other])
+            # select top values, sum up all other values
+            top = heapq.nlargest(maxNof - 1, vals, key=_KEY_VALUE)
+            topSet = set(top)
+            sumOther = sum((v.value for v in vals if v not in topSet), _ZERO)
             if sumOther:
-                vals += [ReportDatasetValue("...", sumOther, [])]
+                top.append(ReportDatasetValue("...", sumOther, []))
+            return top
+        vals.sort(key=_KEY_VALUE, reverse=True)
         return vals
 
     @property
     def sum(self):
         """Return sum of all values in group"""
-        return sum(map(lambda v: v.value, self._values))
+        return self._sum
 
     @property
     def label(self):
@@ -252,12 +345,14 @@ class ReportDataset(object):
     def __init__(self):
         """Construct a dataset"""
         self._groups = []
+        self._known = set()  # groups of dataset, for fast membership test
 
     def __iadd__(self, other):
         """Add instance to dataset."""
         if isinstance(other, ReportDatasetGroup):
-            if not other in self._groups:
-                self._groups += [other]
+            if other not in self._known:
+                self._groups.append(other)
+                self._known.add(other)
         elif isinstance(other, ReportDatasetValue):
             g = self._groups[-1]
             g += other
@@ -336,6 +431,7 @@ class Report(object):
         self._fromDate = fromDate
         self._tillDate = tillDate
         self._items = None
+        self._monthly = None
         self._datasets = {}
 
     @property
@@ -348,93 +444,134 @@ class Report(object):
         """Get iterator for items generated by this report."""
         if self._items is not None:
             return self._items
-        fromFilter = FilterGreaterOrEqualDate(self._fromDate)
-        tillFilter = FilterLessOrEqualDate(self._tillDate)
-        dateFilter = fromFilter & tillFilter
         accFilter = FilterAccountsAndChildren(*self._accounts)
-        self._items = list(self._db.filterItems(accFilter & dateFilter))
+        self._items = list(self._db.filterItemsBetween(self._fromDate, self._tillDate, accFilter))
         return iter(self._items)
 
+    def _monthlyGrouping(self):
+        """Return items grouped by monthly interval, shared by all monthly datasets"""
+        if self._monthly is None:
+            self._monthly = ItemGroupingByDateRange(self._fromDate, self._tillDate, INTERVAL_MONTHLY)
+            self._monthly.bulkBuild(self.items)
+        return self._monthly
+
+    def _cached(self, key, builder):
+        """Return dataset of given key, building it by calling given builder when not yet cached"""
+        dataset = self._datasets.get(key)
+        if dataset is None:
+            dataset = self._datasets[key] = builder()
+        return dataset
+
     def datasetMonthly(self):
         """Return dataset for items grouped by account and sum of values per monthly interval"""
-        if "monthly" in self._datasets:
-            return self._datasets["monthly"]
+        return self._cached("monthly", self._buildDatasetMonthly)
+
+    def datasetMonthlyExpanded(self):
+        """Return dataset for items grouped by expanded account ( resolving child accounts
+        from current selected accounts ) and sum of values per monthly interval"""
+        return self._cached("monthlyExpanded", self._buildDatasetMonthlyExpanded)
+
+    def datasetMonthlyTypes(self):
+        """Return dataset for items grouped by asset type and sum of values per monthly interval"""
+        return self._cached("monthlyTypes", self._buildDatasetMonthlyTypes)
+
+    def _buildDatasetMonthly(self):
+        """Build dataset for items grouped by account and sum of values per monthly interval"""
         dataset = ReportDataset()
-        grp = ItemGroupingByDateRange(self._fromDate, self._tillDate, INTERVAL_MONTHLY)
-        grp += self
+        grp = self._monthlyGrouping()
+        # items of account and its children, except those of other selected child accounts
+        accFilters = []
+        for acc in self._accounts:
+            descendants = acc.selfAndChildAccounts()
+            accInclFilter = FilterAccountsAndChildren(acc)
+            accExclFilter = FilterNotAccountsAndChildren(*[a for a in self._accounts
+                                                           if a is not acc and a in descendants])
+            accFilters.append((acc, accInclFilter & accExclFilter))
         for label in grp.groups():
             dataset += ReportDatasetGroup(label)
-            for acc in self._accounts:
-                accInclFilter = FilterAccountsAndChildren(acc)
-                accExclFilter = FilterNotAccountsAndChildren(*filter(lambda a: acc.hasChildAccount(a), self._accounts))
-                items = list(grp.groupItems(label, accInclFilter & accExclFilter))
-                accsum = sum(items)
-                items.sort(key=lambda x: x.date)
+            for acc, accFilter in accFilters:
+                # grouped items are sorted by date already
+                items = list(grp.groupItems(label, accFilter))
+                accsum = _ZERO
+                for i in items:
+                    accsum += i.value
                 dataset += ReportDatasetValue(acc.fullname, accsum, items)
-        self._datasets["monthly"] = dataset
-        return self._datasets["monthly"]
+        return dataset
 
-    def datasetMonthlyExpanded(self):
-        """Return dataset for items grouped by expanded account ( resolving child accounts
-        from current selected accounts ) and sum of values per monthly interval"""
-        if "monthlyExpanded" in self._datasets:
-            return self._datasets["monthlyExpanded"]
+    def _buildDatasetMonthlyExpanded(self):
+        """Build dataset for items grouped by expanded account and sum of values per monthly interval"""
         dataset = ReportDataset()
-        grp = ItemGroupingByDateRange(self._fromDate, self._tillDate, INTERVAL_MONTHLY)
-        grp += self
+        grp = self._monthlyGrouping()
         allAccounts = []
+        seen = set()
         for acc in self._accounts:
-            if acc not in allAccounts:
-                allAccounts += [acc]
+            if acc not in seen:
+                allAccounts.append(acc)
+                seen.add(acc)
                 for subacc in acc.getChildAccounts(True):
-                    if subacc not in allAccounts:
-                        allAccounts += [subacc]
+                    if subacc not in seen:
+                        allAccounts.append(subacc)
+                        seen.add(subacc)
+        accFilters = [(acc, FilterAccounts(acc)) for acc in allAccounts]
         for label in grp.groups():
             dataset += ReportDatasetGroup(label)
-            for acc in allAccounts:
-                accFilter = FilterAccounts(acc)
+            for acc, accFilter in accFilters:
                 items = list(grp.groupItems(label, accFilter))
-                accsum = sum(items)
-                items.sort()
+                accsum = _ZERO
+                for i in items:
+                    accsum += i.value
                 dataset += ReportDatasetValue(acc.fullname, accsum, items)
-        self._datasets["monthlyExpanded"] = dataset
-        return self._datasets["monthlyExpanded"]
+        return dataset
 
-    def datasetMonthlyTypes(self):
-        """Return dataset for items grouped by asset type and sum of values per monthly interval"""
-        if "monthlyTypes" in self._datasets:
-            return self._datasets["monthly"]
+    def _buildDatasetMonthlyTypes(self):
+        """Build dataset for items grouped by asset type and sum of values per monthly interval"""
         dataset = ReportDataset()
-        grp = ItemGroupingByDateRange(self._fromDate, self._tillDate, INTERVAL_MONTHLY)
-        grp += self
+        grp = self._monthlyGrouping()
+        typeFilters = [(type, FilterAccountTypes(type))
+                       for type in (Account.TYPE_ASSET, Account.TYPE_LIABILITY, Account.TYPE_PROFIT, Account.TYPE_EXPENSE)]
         for label in grp.groups():
-            balance = Decimal()
+            balance = _ZERO
             dataset += ReportDatasetGroup(label)
-            for type in (Account.TYPE_ASSET, Account.TYPE_LIABILITY, Account.TYPE_PROFIT, Account.TYPE_EXPENSE):
-                typeFilter = FilterAccountTypes(type)
+            for type, typeFilter in typeFilters:
                 items = list(grp.groupItems(label, typeFilter))
-                typesum = sum([i.valueDerived for i in items])
+                typesum = _ZERO
+                for i in items:
+                    typesum += i.valueDerived
                 if type in (Account.TYPE_PROFIT,Account.TYPE_EXPENSE):
                     balance += typesum
-                items.sort(key=lambda x: x.date)
                 dataset += ReportDatasetValue(Account.ALL_TYPES[type], typesum, items)
             dataset += ReportDatasetValue("Balance", balance, [])
-        self._datasets["monthlyTypes"] = dataset
-        return self._datasets["monthlyTypes"]
+        return dataset
 
 
 class ReportTemplate(object):
     """Represents a text templates that can be feed by report output to generate e.g. HTML."""
 
+    # environments by search path, shared by all templates to reuse their compiled templates
+    _ENVIRONMENTS = {}
+    # number of template chunks collected before writing them when streaming output
+    STREAM_BUFFER_SIZE = 64
+
     def __init__(self, basepath, name):
         """Create report template of given name using selected search path."""
         if not os.path.isdir(basepath):
             raise IOError("Dir not found: " + basepath)
         self._basePath = os.path.abspath(basepath)
-        self._env = jinja2.Environment(loader=jinja2.FileSystemLoader(searchpath=self._basePath),
-                                       extensions=['jinja2.ext.loopcontrols'])
+        self._env = ReportTemplate._environment(self._basePath)
         self._name = name
         self._nextId = 1
+        self._tmpl = None
+        self._raw = None
+
+    @staticmethod
+    def _environment(basepath):
+        """Return jinja environment loading templates from given search path."""
+        env = ReportTemplate._ENVIRONMENTS.get(basepath)
+        if env is None:
+            env = jinja2.Environment(loader=jinja2.FileSystemLoader(searchpath=basepath),
+                                     extensions=['jinja2.ext.loopcontrols'])
+            ReportTemplate._ENVIRONMENTS[basepath] = env
+        return env
 
     @property
     def name(self):
@@ -448,10 +585,21 @@ class ReportTemplate(object):
     def basepath(self):
         return self._basePath
 
+    def _template(self):
+        """Return compiled template, it only gets reloaded when its file has changed.
+        The environment caches the compiled template for other instances too."""
+        if self._tmpl is None or not self._tmpl.is_up_to_date:
+            self._tmpl = self._env.get_template(self._name)
+            self._raw = None
+        return self._tmpl
+
     def raw(self):
         """Return raw text of the template."""
-        tmpl = self._env.get_template(self._name)
-        return open(tmpl.filename, "rb").read()
+        tmpl = self._template()
+        if self._raw is None:
+            with open(tmpl.filename, "rb") as f:
+                self._raw = f.read()
+        return self._raw
 
     def _newId(self):
         """Create a new identifier"""
@@ -459,12 +607,23 @@ class ReportTemplate(object):
         self._nextId += 1
         return currId
 
-    def render(self, report):
-        """Render template with data generated by given report."""
+    def _context(self, report):
+        """Return template context for given report."""
         if not isinstance(report, Report):
             raise TypeError("Expected Report instance")
         ctxt = {}
         ctxt["report"] = report
         ctxt["newid"] = self._newId
-        tmpl = self._env.get_template(self._name)
-        return tmpl.render(**ctxt)
+        return ctxt
+
+    def render(self, report):
+        """Render template with data generated by given report."""
+        ctxt = self._context(report)
+        return self._template().render(**ctxt)
+
+    def renderInto(self, report, fileObj):
+        """Render template with data generated by given report, streaming output into given file like object."""
+        ctxt = self._context(report)
+        stream = self._template().stream(**ctxt)
+        stream.enable_buffering(ReportTemplate.STREAM_BUFFER_SIZE)
+        stream.dump(fileObj)
@@ -71,6 +71,42 @@ class TestAccounts(unittest.TestCase):
         current_acc_items = list(acc2.filterItems())
         self.assertListEqual(expected_acc_items, current_acc_items)
 
+    def test_04_lookup_after_change(self):
+        db = Database()
+        acc = Account("Root")
+        db += acc
+        sacc = Account("Sub")
+        acc += sacc
+        self.assertIs(sacc, db["Root/Sub"])
+
+        sacc.setName("Renamed")
+        self.assertNotIn("Root/Sub", db)
+        self.assertIs(sacc, db["Root/Renamed"])
+
+        other = Account("Other")
+        db += other
+        acc -= sacc
+        other += sacc
+        self.assertNotIn("Root/Renamed", db)
+        self.assertIs(sacc, db["Other/Renamed"])
+
+
+    def test_05_self_and_child_accounts(self):
+        root = Account("Root")
+        sub = Account("Sub")
+        root += sub
+        self.assertSetEqual({root, sub}, root.selfAndChildAccounts())
+
+        subsub = Account("SubSub")
+        sub += subsub
+        self.assertSetEqual({root, sub, subsub}, root.selfAndChildAccounts())
+        self.assertTrue(root.isSelfOrHasChildAccount(subsub))
+
+        root -= sub
+        self.assertSetEqual({root}, root.selfAndChildAccounts())
+        self.assertFalse(root.isSelfOrHasChildAccount(subsub))
+
+
 
 if __name__ == "__main__":
     unittest.main()
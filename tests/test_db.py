@@ -114,9 +114,9 @@ class TestFile(unittest.TestCase):
         acc1 += acc2
 
         self.assertEqual(2, db.nofAccounts())
-        account_names = set([a.fullname for a in db.getChildAccounts(recurse=False)])
+        account_names = {a.fullname for a in db.getChildAccounts(recurse=False)}
         self.assertSetEqual({"Root"}, account_names)
-        account_names = set([a.fullname for a in db.getChildAccounts(recurse=True)])
+        account_names = {a.fullname for a in db.getChildAccounts(recurse=True)}
         self.assertSetEqual({"Root", "Root/Foo"}, account_names)
 
         db.save(self.temp_path)
@@ -127,9 +127,9 @@ class TestFile(unittest.TestCase):
         acc1 += acc3
 
         self.assertEqual(3, db.nofAccounts())
-        account_names = set([a.fullname for a in db.getChildAccounts(recurse=False)])
+        account_names = {a.fullname for a in db.getChildAccounts(recurse=False)}
         self.assertSetEqual({"Root"}, account_names)
-        account_names = set([a.fullname for a in db.getChildAccounts(recurse=True)])
+        account_names = {a.fullname for a in db.getChildAccounts(recurse=True)}
         self.assertSetEqual({"Root", "Root/Foo", "Root/Bar"}, account_names)
 
         db.save(self.temp_path)
@@ -140,9 +140,9 @@ class TestFile(unittest.TestCase):
         acc3 += acc4
 
         self.assertEqual(4, db.nofAccounts())
-        account_names = set([a.fullname for a in db.getChildAccounts(recurse=False)])
+        account_names = {a.fullname for a in db.getChildAccounts(recurse=False)}
         self.assertSetEqual({"Root"}, account_names)
-        account_names = set([a.fullname for a in db.getChildAccounts(recurse=True)])
+        account_names = {a.fullname for a in db.getChildAccounts(recurse=True)}
         self.assertSetEqual({"Root", "Root/Foo", "Root/Bar", "Root/Bar/Hello World"}, account_names)
 
         db.save(self.temp_path)
@@ -150,9 +150,9 @@ class TestFile(unittest.TestCase):
         db2 = Database.load(self.temp_path)
 
         self.assertEqual(4, db2.nofAccounts())
-        account_names = set([a.fullname for a in db2.getChildAccounts(recurse=False)])
+        account_names = {a.fullname for a in db2.getChildAccounts(recurse=False)}
         self.assertSetEqual({"Root"}, account_names)
-        account_names = set([a.fullname for a in db2.getChildAccounts(recurse=True)])
+        account_names = {a.fullname for a in db2.getChildAccounts(recurse=True)}
         self.assertSetEqual({"Root", "Root/Foo", "Root/Bar", "Root/Bar/Hello World"}, account_names)
 
 
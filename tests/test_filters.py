@@ -1,5 +1,6 @@
 import unittest
 
+from accounting.core.filter import CombinedFilter
 from accounting.core.core import Account, Transaction, Item
 from accounting.core.core import FilterLessOrEqualDate, FilterGreaterOrEqualDate
 from accounting.core.core import FilterAccountsAndChildren
@@ -92,6 +93,27 @@ class TestFilters(unittest.TestCase):
         f = FilterAccountsAndChildren(a2, a3)
         self.assertFalse(f.accepted(i))
 
+    def testFilterManyByDate(self):
+        f1 = FilterGreaterOrEqualDate("2013-07-01")
+        f2 = FilterLessOrEqualDate("2013-07-31")
+
+        trns = [Transaction(d) for d in ("2013-07-07", "2013-08-07", "2013-06-07", "2013-07-31")]
+        self.assertListEqual([trns[0], trns[1], trns[3]], f1.acceptedMany(trns))
+        self.assertListEqual([trns[0], trns[2], trns[3]], f2.acceptedMany(trns))
+        self.assertListEqual([trns[0], trns[3]], (f1 & f2).acceptedMany(trns))
+        self.assertListEqual(trns, (f1 | f2).acceptedMany(trns))
+
+    def testFilterCombinedAnd(self):
+        f1 = FilterGreaterOrEqualDate("2013-07-01")
+        f2 = FilterLessOrEqualDate("2013-07-31")
+        f3 = FilterGreaterOrEqualDate("2013-07-10")
+        f = CombinedFilter() & f1 & (f2 & f3)
+
+        self.assertTupleEqual((f1, f2, f3), f._combined)
+        self.assertTrue(f.accepted(Transaction("2013-07-10")))
+        self.assertTrue(f.rejected(Transaction("2013-07-07")))
+        self.assertTrue(f.rejected(Transaction("2013-08-07")))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import datetime
+
+from PyQt5 import QtCore
+
+from accounting.core.core import Database, Account, Transaction, FilterDateRange
+from accounting.gui.models import AccountTransactionsModel, CustomTransactionFilter
+
+
+class CountingDateRangeFilter(FilterDateRange):
+    """Date range filter counting how often it got evaluated"""
+
+    def __init__(self, fromDate, tillDate):
+        super().__init__(fromDate, tillDate)
+        self.nofAccepted = 0
+
+    def _accepted(self, obj):
+        self.nofAccepted += 1
+        return super()._accepted(obj)
+
+
+class TestCustomTransactionFilter(unittest.TestCase):
+
+    def setUp(self):
+        self._today = datetime.date.today()
+        db = Database()
+        self._acc = Account("Foo")
+        db += self._acc
+        other = Account("Bar")
+        db += other
+        trns = []
+        for days in range(20):
+            t = Transaction(self._today - datetime.timedelta(days=days), "trn%d" % days)
+            t.addItems([("item%d" % days, days + 1, self._acc), ("other%d" % days, -(days + 1), other)])
+            trns.append(t)
+        db += trns
+        self._src = AccountTransactionsModel(self._acc)
+        self._proxy = CustomTransactionFilter()
+        self._proxy.setSourceModel(self._src)
+        self._proxy.setDynamicSortFilter(True)
+        self._filter = CountingDateRangeFilter(self._today - datetime.timedelta(days=4), self._today)
+        self._proxy.filter(self._filter)
+
+    def _acceptedSourceRows(self):
+        root = QtCore.QModelIndex()
+        return [row for row in range(self._src.rowCount(root)) if self._src.filterAcceptsRow(row, self._filter)]
+
+    def _proxySourceRows(self):
+        return [self._proxy.mapToSource(self._proxy.index(row, 0)).row() for row in range(self._proxy.rowCount())]
+
+    def test_insert_row(self):
+        # each transaction shows a row for itself and one for each of its items
+        self.assertEqual(15, self._proxy.rowCount())
+
+        self._filter.nofAccepted = 0
+        self._src.addTransaction(self._today, "new", 1)
+        self.assertEqual(17, self._proxy.rowCount())
+        self.assertLessEqual(self._filter.nofAccepted, 2)  # only inserted rows got evaluated
+        self.assertListEqual(self._acceptedSourceRows(), self._proxySourceRows())
+
+        self._src.addTransaction(self._today - datetime.timedelta(days=30), "old", 1)
+        self.assertEqual(17, self._proxy.rowCount())
+        self.assertListEqual(self._acceptedSourceRows(), self._proxySourceRows())
+
+    def test_remove_row(self):
+        # remove latest transaction and its items
+        self._filter.nofAccepted = 0
+        self._src.removeRow(self._src.rowCount(QtCore.QModelIndex()) - 3)
+        self.assertEqual(0, self._filter.nofAccepted)
+        self.assertEqual(12, self._proxy.rowCount())
+        self.assertListEqual(self._acceptedSourceRows(), self._proxySourceRows())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,25 @@
 import unittest
+import io
 import os
 import datetime
+import functools
+
+from decimal import Decimal
 
 from accounting.core.core import Database, Account, Transaction, Item
 from accounting.report import Report, ItemGroupingByDateRange, ReportTemplate
+from accounting.report import ReportDatasetGroup, ReportDatasetValue
 from accounting.core.dateutils import rangeDateFromTillByInterval, date_from_value
 from accounting.core.dateutils import INTERVAL_DAILY, INTERVAL_WEEKLY, INTERVAL_MONTHLY, INTERVAL_ANUALY
 
+REPORT_TEMPLATE_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "accounting", "templates"))
+PCT_TEMPLATE_NAME = "report_monthly_list_grouped_pct.accrep"
+
+
+@functools.lru_cache(maxsize=None)
+def _reportTemplate(name):
+    return ReportTemplate(REPORT_TEMPLATE_DIR, name)
+
 
 class TestReport(unittest.TestCase):
     dates = (date_from_value("2018-03-08"),
@@ -19,21 +32,18 @@ class TestReport(unittest.TestCase):
              date_from_value("2020-06-02"),
              )
 
-    def _newItem(self, descr, val, trn, acc):
-        i = Item(descr, val)
-        trn += i
-        i += acc
-        return i
-
-    def _newTransaction(self, date, descr):
+    @staticmethod
+    def _newTransaction(date, descr, *items):
         t = Transaction(date, descr)
-        self._db += t
+        t.addItems(items)
         return t
 
-    def setUp(self):
-        self._db = Database()
+    @classmethod
+    def setUpClass(cls):
+        # tests only read the database, build it once for all of them
+        cls._db = Database()
         accRoot = Account("Root")
-        self._db += accRoot
+        cls._db += accRoot
         accFoo = Account("Foo")
         accRoot += accFoo
         accBar = Account("Bar")
@@ -41,207 +51,171 @@ class TestReport(unittest.TestCase):
         accTest = Account("Test")
         accRoot += accTest
 
-        t = self._newTransaction(self.dates[0], "one")
-        self._newItem("AAA", 2.5, t, accFoo)
-        self._newItem("BBB", -2.5, t, accBar)
-
-        t = self._newTransaction(self.dates[1], "two")
-        self._newItem("CCC", -2, t, accRoot)
-        self._newItem("DDD", 2, t, accTest)
-
-        t = self._newTransaction(self.dates[2], "three")
-        self._newItem(u"EEE", 4, t, accFoo)
-        self._newItem(u"FFF", -4, t, accBar)
-
-        t = self._newTransaction(self.dates[2], "four")
-        self._newItem(u"GGG", 3, t, accFoo)
-        self._newItem(u"HHH", -3, t, accBar)
-
-        t = self._newTransaction(self.dates[3], "five")
-        self._newItem(u"III", 5, t, accFoo)
-        self._newItem(u"JJJ", -5, t, accTest)
-
-        t = self._newTransaction(self.dates[4], "six")
-        self._newItem(u"KKK", 5, t, accFoo)
-        self._newItem(u"LLL", -5, t, accBar)
-
-        t = self._newTransaction(self.dates[4], "seven")
-        self._newItem(u"MMM", 7, t, accFoo)
-        self._newItem(u"NNN", -7, t, accBar)
-
-        t = self._newTransaction(self.dates[5], "eight")
-        self._newItem(u"OOO", 1, t, accFoo)
-        self._newItem(u"PPP", -1, t, accBar)
-
-        t = self._newTransaction(self.dates[6], "nine")
-        self._newItem(u"QQQ", 1, t, accTest)
-        self._newItem(u"RRR", -1, t, accBar)
-
-        t = self._newTransaction(self.dates[7], "ten")
-        self._newItem(u"SSS", 1, t, accFoo)
-        self._newItem(u"TTT", -1, t, accBar)
-
-    def tearDown(self):
-        self._db = None
-
-    def test_account_daily(self):
-        fromDate, tillDate = rangeDateFromTillByInterval(self.dates[0], self.dates[0], INTERVAL_DAILY)
-        report = Report(self._db, fromDate, tillDate)
-        report += self._db["Root/Test"]
-        items = [i.descr for i in report.items]
-        self.assertSetEqual(set(), set(items))
-
-        fromDate, tillDate = rangeDateFromTillByInterval(self.dates[0], self.dates[0], INTERVAL_DAILY)
+        cls._db += [
+            cls._newTransaction(cls.dates[0], "one", ("AAA", 2.5, accFoo), ("BBB", -2.5, accBar)),
+            cls._newTransaction(cls.dates[1], "two", ("CCC", -2, accRoot), ("DDD", 2, accTest)),
+            cls._newTransaction(cls.dates[2], "three", ("EEE", 4, accFoo), ("FFF", -4, accBar)),
+            cls._newTransaction(cls.dates[2], "four", ("GGG", 3, accFoo), ("HHH", -3, accBar)),
+            cls._newTransaction(cls.dates[3], "five", ("III", 5, accFoo), ("JJJ", -5, accTest)),
+            cls._newTransaction(cls.dates[4], "six", ("KKK", 5, accFoo), ("LLL", -5, accBar)),
+            cls._newTransaction(cls.dates[4], "seven", ("MMM", 7, accFoo), ("NNN", -7, accBar)),
+            cls._newTransaction(cls.dates[5], "eight", ("OOO", 1, accFoo), ("PPP", -1, accBar)),
+            cls._newTransaction(cls.dates[6], "nine", ("QQQ", 1, accTest), ("RRR", -1, accBar)),
+            cls._newTransaction(cls.dates[7], "ten", ("SSS", 1, accFoo), ("TTT", -1, accBar)),
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._db = None
+
+    def _reportItemDescrs(self, fromIdx, tillIdx, interval, *accounts):
+        fromDate, tillDate = rangeDateFromTillByInterval(self.dates[fromIdx], self.dates[tillIdx], interval)
         report = Report(self._db, fromDate, tillDate)
-        report += self._db["Root/Foo"]
-        items = [i.descr for i in report.items]
-        self.assertSetEqual({'AAA'}, set(items))
+        for acc in accounts:
+            report += acc
+        return {i.descr for i in report.items}
 
-        fromDate, tillDate = rangeDateFromTillByInterval(self.dates[1], self.dates[2], INTERVAL_DAILY)
-        report = Report(self._db, fromDate, tillDate)
-        report += self._db["Root/Foo"]
-        items = [i.descr for i in report.items]
-        self.assertSetEqual({'EEE', 'GGG'}, set(items))
+    def test_account_daily(self):
+        accFoo = self._db["Root/Foo"]
+        accBar = self._db["Root/Bar"]
+        self.assertFalse(self._reportItemDescrs(0, 0, INTERVAL_DAILY, self._db["Root/Test"]))
 
-        fromDate, tillDate = rangeDateFromTillByInterval(self.dates[0], self.dates[3], INTERVAL_DAILY)
-        report = Report(self._db, fromDate, tillDate)
-        report += self._db["Root/Foo"]
-        report += self._db["Root/Bar"]
-        items = [i.descr for i in report.items]
-        self.assertSetEqual({'AAA', 'BBB', 'EEE', 'FFF', 'GGG', 'HHH', 'III'}, set(items))
+        scenarios = ((0, 0, (accFoo,), {'AAA'}),
+                     (1, 2, (accFoo,), {'EEE', 'GGG'}),
+                     (0, 3, (accFoo, accBar), {'AAA', 'BBB', 'EEE', 'FFF', 'GGG', 'HHH', 'III'}))
+        for fromIdx, tillIdx, accounts, expected in scenarios:
+            with self.subTest(fromIdx=fromIdx, tillIdx=tillIdx, accounts=accounts):
+                self.assertSetEqual(expected, self._reportItemDescrs(fromIdx, tillIdx, INTERVAL_DAILY, *accounts))
 
     def test_account_and_children_daily(self):
         fromDate, tillDate = rangeDateFromTillByInterval(self.dates[0], self.dates[2], INTERVAL_DAILY)
         report = Report(self._db, fromDate, tillDate)
         report += self._db["Root"]
-        items = [i.descr for i in report.items]
-        self.assertSetEqual({'AAA', 'BBB', 'CCC', 'DDD', 'EEE', 'FFF', 'GGG', 'HHH'}, set(items))
+        items = {i.descr for i in report.items}
+        self.assertSetEqual({'AAA', 'BBB', 'CCC', 'DDD', 'EEE', 'FFF', 'GGG', 'HHH'}, items)
 
         fromDate, tillDate = rangeDateFromTillByInterval(self.dates[0], self.dates[3], INTERVAL_DAILY)
         report = Report(self._db, fromDate, tillDate + datetime.timedelta(days=1))
         report += self._db["Root"]
-        items = [i.descr for i in report.items]
-        self.assertSetEqual({'AAA', 'BBB', 'CCC', 'DDD', 'EEE', 'FFF', 'GGG', 'HHH', 'III', 'JJJ'}, set(items))
+        items = {i.descr for i in report.items}
+        self.assertSetEqual({'AAA', 'BBB', 'CCC', 'DDD', 'EEE', 'FFF', 'GGG', 'HHH', 'III', 'JJJ'}, items)
+
+    def _assertGroupedByInterval(self, interval, account, scenarios):
+        """Check report items and their grouping by interval for every scenario of
+        ( from date index, till date index, days of range, expected descriptions per date range )."""
+        for fromIdx, tillIdx, days, expected in scenarios:
+            with self.subTest(fromIdx=fromIdx, tillIdx=tillIdx):
+                fromDate, tillDate = rangeDateFromTillByInterval(self.dates[fromIdx], self.dates[tillIdx], interval)
+                self.assertEqual(datetime.timedelta(days=days), tillDate - fromDate)
+
+                report = Report(self._db, fromDate, tillDate)
+                report += account
+                self.assertSetEqual(set().union(*expected), {i.descr for i in report.items})
+
+                grp = ItemGroupingByDateRange(fromDate, tillDate, interval)
+                grp += report
+                items_per_data_ranges = [{i.descr for i in items} for dummyRange, items in grp.itemsByGroup()]
+                self.assertListEqual(expected, items_per_data_ranges)
 
     def test_accounts_by_week(self):
-        fromDate, tillDate = rangeDateFromTillByInterval(self.dates[0], self.dates[0], INTERVAL_WEEKLY)
-        self.assertEqual(datetime.timedelta(days=6), tillDate - fromDate)
+        self._assertGroupedByInterval(INTERVAL_WEEKLY, self._db["Root/Foo"], (
+            (0, 0, 6, [{'AAA'}]),
+            (0, 2, 13, [{'AAA'}, {'EEE', 'GGG'}]),
+        ))
 
-        report = Report(self._db, fromDate, tillDate)
-        report += self._db["Root/Foo"]
-        items = [i.descr for i in report.items]
-        self.assertSetEqual({'AAA'}, set(items))
-
-        grp = ItemGroupingByDateRange(fromDate, tillDate, INTERVAL_WEEKLY)
-        grp += report
-
-        date_ranges = list(grp.groups())
-        self.assertEqual(1, len(date_ranges))
-        items_per_data_ranges = [list(grp.groupItems(date_range)) for date_range in date_ranges]
-        items_per_data_ranges = [[i.descr for i in items] for items in items_per_data_ranges]
-        self.assertSetEqual({'AAA'}, set(items_per_data_ranges[0]))
+    def test_05_accounts_by_month(self):
+        self._assertGroupedByInterval(INTERVAL_MONTHLY, self._db["Root/Foo"], (
+            (0, 0, 30, [{'AAA', 'EEE', 'GGG'}]),
+            (0, 3, 60, [{'AAA', 'EEE', 'GGG'}, {'III'}]),
+        ))
 
-        fromDate, tillDate = rangeDateFromTillByInterval(self.dates[0], self.dates[2], INTERVAL_WEEKLY)
-        self.assertEqual(datetime.timedelta(days=13), tillDate - fromDate)
+    def test_06_accounts_by_year(self):
+        self._assertGroupedByInterval(INTERVAL_ANUALY, self._db["Root/Bar"], (
+            (0, 0, 364, [{'BBB', 'FFF', 'HHH', 'LLL', 'NNN', 'PPP'}]),
+            (0, 6, 729, [{'BBB', 'FFF', 'HHH', 'LLL', 'NNN', 'PPP'}, {'RRR'}]),
+        ))
 
+    def test_08_pie_template(self):
+        fromDate, tillDate = rangeDateFromTillByInterval(self.dates[0], self.dates[0], INTERVAL_MONTHLY)
         report = Report(self._db, fromDate, tillDate)
-        report += self._db["Root/Foo"]
-        items = [i.descr for i in report.items]
-        self.assertSetEqual({'AAA', 'EEE', 'GGG'}, set(items))
-
-        grp = ItemGroupingByDateRange(fromDate, tillDate, INTERVAL_WEEKLY)
-        grp += report
-
-        date_ranges = list(grp.groups())
-        self.assertEqual(2, len(date_ranges))
-        items_per_data_ranges = [list(grp.groupItems(date_range)) for date_range in date_ranges]
-        items_per_data_ranges = [[i.descr for i in items] for items in items_per_data_ranges]
-        self.assertSetEqual({'AAA'}, set(items_per_data_ranges[0]))
-        self.assertSetEqual({'EEE', 'GGG'}, set(items_per_data_ranges[1]))
-
-    def test_05_accounts_by_month(self):
+        report += self._db["Root/Bar"]
+        html = _reportTemplate(PCT_TEMPLATE_NAME).render(report)
+        self.assertTrue(html)
+        if os.environ.get("ACCOUNTING_WRITE_TEST_HTML"):
+            # keep rendered output for manual inspection
+            html_path = os.path.join(REPORT_TEMPLATE_DIR, os.path.splitext(PCT_TEMPLATE_NAME)[0] + ".html")
+            with open(html_path, "w", encoding="utf-8") as f:
+                f.write(html)
+
+    def test_09_render_into(self):
         fromDate, tillDate = rangeDateFromTillByInterval(self.dates[0], self.dates[0], INTERVAL_MONTHLY)
-        self.assertEqual(datetime.timedelta(days=30), tillDate - fromDate)
+        report = Report(self._db, fromDate, tillDate)
+        report += self._db["Root/Bar"]
+        html = ReportTemplate(REPORT_TEMPLATE_DIR, PCT_TEMPLATE_NAME).render(report)
+        f = io.StringIO()
+        ReportTemplate(REPORT_TEMPLATE_DIR, PCT_TEMPLATE_NAME).renderInto(report, f)
+        self.assertEqual(html, f.getvalue())
 
+    def test_10_cached_datasets(self):
+        fromDate, tillDate = rangeDateFromTillByInterval(self.dates[0], self.dates[3], INTERVAL_MONTHLY)
         report = Report(self._db, fromDate, tillDate)
         report += self._db["Root/Foo"]
-        items = [i.descr for i in report.items]
-        self.assertSetEqual({'AAA', 'EEE', 'GGG'}, set(items))
-
-        grp = ItemGroupingByDateRange(fromDate, tillDate, INTERVAL_MONTHLY)
-        grp += report
-
-        date_ranges = list(grp.groups())
-        self.assertEqual(1, len(date_ranges))
-        items_per_data_ranges = [list(grp.groupItems(date_range)) for date_range in date_ranges]
-        items_per_data_ranges = [[i.descr for i in items] for items in items_per_data_ranges]
-        self.assertSetEqual({'AAA', 'EEE', 'GGG'}, set(items_per_data_ranges[0]))
-
+        monthly = report.datasetMonthly()
+        types = report.datasetMonthlyTypes()
+        self.assertIsNot(monthly, types)
+        self.assertIs(monthly, report.datasetMonthly())
+        self.assertIs(types, report.datasetMonthlyTypes())
+        self.assertEqual(["Asset", "Liability", "Profit", "Expense", "Balance"], types.series)
+
+    def test_11_dataset_items_by_date(self):
         fromDate, tillDate = rangeDateFromTillByInterval(self.dates[0], self.dates[3], INTERVAL_MONTHLY)
-        self.assertEqual(datetime.timedelta(days=60), tillDate - fromDate)
-
+        report = Report(self._db, fromDate, tillDate)
+        report += self._db["Root"]
+        dataset = report.datasetMonthlyExpanded()
+        values = {v.label: [i.descr for i in v.items] for v in dataset[0]}
+        self.assertListEqual(["AAA", "EEE", "GGG"], values["Root/Foo"])
+        self.assertListEqual(["BBB", "FFF", "HHH"], values["Root/Bar"])
+        self.assertEqual(4, len(dataset[0]))
+
+    def test_12_sorted_values(self):
+        grp = ReportDatasetGroup("grp")
+        for label, value in (("a", 3), ("b", 7), ("c", 0), ("d", 1), ("e", 5), ("f", 2)):
+            grp += ReportDatasetValue(label, Decimal(value), [])
+        self.assertListEqual(["b", "e", "a", "f", "d"], [v.label for v in grp.sorted()])
+        top = grp.sorted(3)
+        self.assertListEqual(["b", "e", "..."], [v.label for v in top])
+        self.assertEqual(grp.sum, sum(v.value for v in top))
+
+    def test_13_bulk_build(self):
+        fromDate, tillDate = rangeDateFromTillByInterval(self.dates[0], self.dates[4], INTERVAL_MONTHLY)
         report = Report(self._db, fromDate, tillDate)
         report += self._db["Root/Foo"]
-        items = [i.descr for i in report.items]
-        self.assertSetEqual({'AAA', 'EEE', 'GGG', 'III'}, set(items))
 
         grp = ItemGroupingByDateRange(fromDate, tillDate, INTERVAL_MONTHLY)
-        grp += report
-
+        grp.bulkBuild(report.items)
         date_ranges = list(grp.groups())
-        self.assertEqual(2, len(date_ranges))
-        items_per_data_ranges = [list(grp.groupItems(date_range)) for date_range in date_ranges]
-        items_per_data_ranges = [[i.descr for i in items] for items in items_per_data_ranges]
-        self.assertSetEqual({'AAA', 'EEE', 'GGG'}, set(items_per_data_ranges[0]))
-        self.assertSetEqual({'III'}, set(items_per_data_ranges[1]))
+        self.assertEqual(4, len(date_ranges))
+        items_per_data_ranges = [[i.descr for i in grp.groupItems(date_range)] for date_range in date_ranges]
+        self.assertListEqual([["AAA", "EEE", "GGG"], ["III"], [], ["KKK", "MMM"]], items_per_data_ranges)
 
-    def test_06_accounts_by_year(self):
-        fromDate, tillDate = rangeDateFromTillByInterval(self.dates[0], self.dates[0], INTERVAL_ANUALY)
-        self.assertEqual(datetime.timedelta(days=364), tillDate - fromDate)
+        grp.clear()
+        self.assertEqual(date_ranges, list(grp.groups()))
+        self.assertListEqual([[], [], [], []], [list(grp.groupItems(date_range)) for date_range in date_ranges])
 
+    def test_14_unsorted_items(self):
+        fromDate, tillDate = rangeDateFromTillByInterval(self.dates[0], self.dates[3], INTERVAL_MONTHLY)
         report = Report(self._db, fromDate, tillDate)
-        report += self._db["Root/Bar"]
-        items = [i.descr for i in report.items]
-        self.assertSetEqual({'BBB', 'FFF', 'HHH', 'LLL', 'NNN', 'PPP'}, set(items))
-
-        grp = ItemGroupingByDateRange(fromDate, tillDate, INTERVAL_ANUALY)
-        grp += report
-
-        date_ranges = list(grp.groups())
-        self.assertEqual(1, len(date_ranges))
-        items_per_data_ranges = [list(grp.groupItems(date_range)) for date_range in date_ranges]
-        items_per_data_ranges = [[i.descr for i in items] for items in items_per_data_ranges]
-        self.assertSetEqual({'BBB', 'FFF', 'HHH', 'LLL', 'NNN', 'PPP'}, set(items_per_data_ranges[0]))
-
-        fromDate, tillDate = rangeDateFromTillByInterval(self.dates[0], self.dates[6], INTERVAL_ANUALY)
-        self.assertEqual(datetime.timedelta(days=729), tillDate - fromDate)
-
-        report = Report(self._db, fromDate, tillDate)
-        report += self._db["Root/Bar"]
-        items = [i.descr for i in report.items]
-        self.assertSetEqual({'BBB', 'FFF', 'HHH', 'LLL', 'NNN', 'PPP', 'RRR'}, set(items))
-
-        grp = ItemGroupingByDateRange(fromDate, tillDate, INTERVAL_ANUALY)
-        grp += report
-
-        date_ranges = list(grp.groups())
-        self.assertEqual(2, len(date_ranges))
-        items_per_data_ranges = [list(grp.groupItems(date_range)) for date_range in date_ranges]
-        items_per_data_ranges = [[i.descr for i in items] for items in items_per_data_ranges]
-        self.assertSetEqual({'BBB', 'FFF', 'HHH', 'LLL', 'NNN', 'PPP'}, set(items_per_data_ranges[0]))
-        self.assertSetEqual({'RRR'}, set(items_per_data_ranges[1]))
-
-    def test_08_pie_template(self):
-        fromDate, tillDate = rangeDateFromTillByInterval(self.dates[0], self.dates[0], INTERVAL_MONTHLY)
-        report = Report(self._db, fromDate, tillDate)
-        report += self._db["Root/Bar"]
-        report_template_dir = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "accounting", "templates"))
-        report_template_name = "report_monthly_list_grouped_pct.accrep"
-        template = ReportTemplate(report_template_dir, report_template_name)
-        html = template.render(report)
-        html_path = os.path.join(report_template_dir, os.path.splitext(report_template_name)[0] + ".html")
-        with open(html_path, "w", encoding="utf-8") as f:
-            f.write(html)
+        report += self._db["Root/Foo"]
+        grp = ItemGroupingByDateRange(fromDate, tillDate, INTERVAL_MONTHLY)
+        grp.bulkBuild(reversed(list(report.items)))
+        items_per_data_ranges = [[i.descr for i in items] for dummyRange, items in grp.itemsByGroup()]
+        # items of same date keep the order they were added in
+        self.assertListEqual([["AAA", "GGG", "EEE"], ["III"]], items_per_data_ranges)
+
+    def test_15_shared_compiled_template(self):
+        template1 = ReportTemplate(REPORT_TEMPLATE_DIR, PCT_TEMPLATE_NAME)
+        template2 = ReportTemplate(REPORT_TEMPLATE_DIR, PCT_TEMPLATE_NAME)
+        self.assertIs(template1._template(), template2._template())
 
 
 if __name__ == "__main__":
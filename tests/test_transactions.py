@@ -1,4 +1,3 @@
-# -*- coding: utf-8 -*-
 '''
 Created on 26.03.2013
 
@@ -14,40 +13,30 @@ from accounting.core.core import Database, Account, Transaction, Item
 
 class TestTransactions(unittest.TestCase):
 
+    def setUp(self):
+        # tests modify their transactions, every test gets a database of its own
+        self._today = datetime.date.today()
+        self._db = Database()
+        self._acc1 = Account("A")
+        self._db += self._acc1
+        self._acc2 = Account("B")
+        self._db += self._acc2
+
     def test_transactions(self):
-        today = datetime.date.today()
-        db = Database()
-        acc1 = Account("A")
-        db += acc1
-        acc2 = Account("B")
-        db += acc2
+        today, db, acc1, acc2 = self._today, self._db, self._acc1, self._acc2
 
         t0 = Transaction(today, "B")
-        db += t0
-        i0 = Item("AA", 1)
-        t0 += i0
-        i0 += acc1
-        i1 = Item("BB", -1)
-        t0 += i1
-        i1 += acc2
-
+        t0.addItems([("AA", 1, acc1), ("BB", -1, acc2)])
         t1 = Transaction(today + datetime.timedelta(days=1), "C")
-        db += t1
-        i2 = Item("CC", -2)
-        t1 += i2
-        i2 += acc1
-        i3 = Item("DD", -2)
-        t1 += i3
-        i3 += acc2
-
+        t1.addItems([("CC", -2, acc1), ("DD", -2, acc2)])
         t2 = Transaction(today - datetime.timedelta(days=5), "A")
-        db += t2
-        i4 = Item("EE", -3)
-        t2 += i4
-        i4 += acc1
-        i5 = Item("FF", -3)
-        t2 += i5
-        i5 += acc2
+        t2.addItems([("EE", -3, acc1), ("FF", -3, acc2)])
+        db.addTransactions([t0, t1, t2])
+
+        self.assertEqual(2, len(t0))
+        self.assertIs(acc1, t0[0].account)
+        self.assertIs(t0, t0[1].transaction)
+        self.assertIs(db, t2.db)
 
         expected_transactions = [t2, t0, t1]
         current_transactions = list(db.filterTransactions())
@@ -60,11 +49,11 @@ class TestTransactions(unittest.TestCase):
         self.assertListEqual(expected_transactions, current_transactions)
 
     def test_balanced(self):
-        db = Database()
+        db = self._db
         asset = Account("Asset")
         db += asset
         debit = Account("Debit")
-        db += asset
+        db += debit
 
         t = Transaction(datetime.date.today())
         db += t
@@ -87,6 +76,64 @@ class TestTransactions(unittest.TestCase):
 
         self.assertEqual(Decimal("0"), t.getBalance())
         self.assertTrue(t.isBalanced())
+        self.assertIs(debit, db["Debit"])
+
+    def test_distinct_descriptions(self):
+        today, db, acc = self._today, self._db, self._acc1
+        for days, descr in ((-10, "Old"), (0, "Foo"), (1, "Foo"), (2, "Bar")):
+            t = Transaction(today + datetime.timedelta(days=days), descr)
+            db += t
+            i = Item(descr.lower(), 1)
+            t += i
+            i += acc
+
+        self.assertSetEqual({"Foo", "Bar"},
+                            db.distinctDescriptionsBetween(today, today + datetime.timedelta(days=5)))
+        self.assertSetEqual({"old", "foo"},
+                            db.distinctDescriptionsBetween(today - datetime.timedelta(days=10), today, Item))
+        with self.assertRaises(TypeError):
+            db.distinctDescriptionsBetween(today, today, Account)
+
+    def test_items_between(self):
+        today, db, acc = self._today, self._db, self._acc1
+        for days, descr in ((3, "Later"), (-10, "Old"), (0, "Foo"), (1, "Bar")):
+            t = Transaction(today + datetime.timedelta(days=days), descr)
+            t.addItems([(descr.lower(), 1, acc)])
+            db += t
+
+        items = db.filterItemsBetween(today, today + datetime.timedelta(days=1))
+        self.assertListEqual(["foo", "bar"], [i.descr for i in items])
+        items = db.filterItemsBetween(today + datetime.timedelta(days=4), today + datetime.timedelta(days=5))
+        self.assertListEqual([], list(items))
+
+    def test_add_transaction_list(self):
+        db = self._db
+        t0 = Transaction(self._today, "B")
+        t1 = Transaction(self._today - datetime.timedelta(days=1), "A")
+        db += [t0, t1]
+        db += (t0,)
+        self.assertListEqual([t1, t0], list(db.filterTransactions()))
+        with self.assertRaises(TypeError):
+            db += [Transaction(self._today), Account("C")]
+        self.assertEqual(2, db.nofTransactions())
+
+    def test_add_items_at_once(self):
+        class CountingTransaction(Transaction):
+            def __iadd__(self, other):
+                self.nofAdds = getattr(self, "nofAdds", 0) + 1
+                return super().__iadd__(other)
+
+        t0 = Transaction(self._today, "A")
+        moved = Item("moved", 1)
+        t0 += moved
+        t1 = CountingTransaction(self._today, "B")
+        added = t1.addItems([moved, ("AA", 1, self._acc1), ("BB", -2, self._acc2), moved])
+        self.assertEqual(0, getattr(t1, "nofAdds", 0))
+        self.assertListEqual(["moved", "AA", "BB"], [i.descr for i in added])
+        self.assertListEqual(added, list(t1))
+        self.assertTrue(all(i.transaction is t1 for i in t1))
+        self.assertEqual(0, len(t0))
+        self.assertIs(self._acc2, t1[2].account)
 
 
 if __name__ == "__main__":